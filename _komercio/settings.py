@@ -10,7 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+from django.core.exceptions import ImproperlyConfigured
+from importlib.util import find_spec
 from pathlib import Path
+from datetime import timedelta
 import os
 import dotenv
 import dj_database_url
@@ -53,6 +56,8 @@ THIRD_PARTY_APPS = [
 MY_APPS = [
     "accounts",
     "products",
+    "changes",
+    "utils",
 ]
 
 
@@ -60,6 +65,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + MY_APPS
 
 
 MIDDLEWARE = [
+    "utils.middleware.PerformanceMetricsMiddleware",
+    "utils.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,6 +74,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "utils.middleware.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "_komercio.urls"
@@ -115,6 +123,128 @@ if DATABASE_URL:
     DATABASES["default"].update(db)
     DEBUG = False
 
+# Replicas de leitura, separadas por virgula. GETs das views com
+# ReplicaReadMixin leem delas; quem acabou de escrever fica no primario por
+# DATABASE_REPLICA_PIN_SECONDS (ver utils.routers)
+DATABASE_REPLICAS = []
+
+for index, url in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(","))
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {**dj_database_url.parse(url), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["utils.routers.ReplicaRouter"]
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", 5))
+
+# Conexoes persistentes por thread com health check; com DATABASE_POOL=true,
+# um pool psycopg2 por processo (ver utils.pooled_postgresql) com um slot por
+# thread do worker do gunicorn (GUNICORN_THREADS, ver gunicorn.conf.py)
+DATABASE_CONN_MAX_AGE = int(os.getenv("DATABASE_CONN_MAX_AGE", 60))
+DATABASE_CONN_HEALTH_CHECKS = (
+    os.getenv("DATABASE_CONN_HEALTH_CHECKS", "true").lower() == "true"
+)
+DATABASE_POOL = os.getenv("DATABASE_POOL", "false").lower() == "true"
+DATABASE_POOL_SIZE = int(
+    os.getenv("DATABASE_POOL_SIZE") or os.getenv("GUNICORN_THREADS", 1)
+)
+
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = DATABASE_CONN_MAX_AGE
+    database["CONN_HEALTH_CHECKS"] = DATABASE_CONN_HEALTH_CHECKS
+    if DATABASE_POOL and database["ENGINE"] == "django.db.backends.postgresql":
+        database["ENGINE"] = "utils.pooled_postgresql"
+        # a conexao volta para o pool ao fim de cada requisicao
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DATABASE_POOL_SIZE,
+            "max_size": DATABASE_POOL_SIZE,
+        }
+
+
+# Metricas por rota em /metrics (ver utils.metrics). Com METRICS_TOKEN, o
+# scraper precisa mandar "Authorization: Bearer <token>"
+METRICS_SLOW_REQUEST_MS = int(os.getenv("METRICS_SLOW_REQUEST_MS", 500))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+
+# Compressao negociada (ver utils.middleware.CompressionMiddleware); corpos
+# menores que COMPRESSION_MIN_SIZE bytes nao compensam e saem sem compressao
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+
+PRODUCT_CACHE_ALIAS = "default"
+PRODUCT_CACHE_TIMEOUT = int(os.getenv("PRODUCT_CACHE_TIMEOUT", 60 * 15))
+
+PRODUCT_BULK_CHUNK_SIZE = int(os.getenv("PRODUCT_BULK_CHUNK_SIZE", 500))
+PRODUCT_EXPORT_CHUNK_SIZE = int(os.getenv("PRODUCT_EXPORT_CHUNK_SIZE", 2000))
+
+AUTH_TOKEN_CACHE_ALIAS = "default"
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv("AUTH_TOKEN_CACHE_TIMEOUT", 60 * 5))
+
+# Idempotency-Key nos POST de criacao (ver utils.mixins.IdempotentCreateMixin)
+IDEMPOTENCY_CACHE_ALIAS = "default"
+IDEMPOTENCY_KEY_TIMEOUT = int(os.getenv("IDEMPOTENCY_KEY_TIMEOUT", 60 * 60 * 24))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 30))
+
+# baldes dos throttles (ver utils.throttling); com REDIS_URL sao
+# compartilhados por todos os workers
+THROTTLE_CACHE_ALIAS = "default"
+# quantos proxies confiaveis poem o IP do cliente no X-Forwarded-For
+THROTTLE_NUM_PROXIES = os.getenv("THROTTLE_NUM_PROXIES")
+THROTTLE_NUM_PROXIES = int(THROTTLE_NUM_PROXIES) if THROTTLE_NUM_PROXIES else None
+
+# outbox de produtos e contas (ver changes.outbox); mudancas substituidas
+# por uma mais nova do mesmo objeto sao apagadas pelo compact_changes
+CHANGE_FEED_RETENTION_HOURS = int(os.getenv("CHANGE_FEED_RETENTION_HOURS", 24 * 7))
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.1/topics/auth/passwords/
+
+PASSWORD_HASHER_CLASSES = {
+    "pbkdf2": "accounts.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "accounts.hashers.TunedScryptPasswordHasher",
+    "argon2": "accounts.hashers.TunedArgon2PasswordHasher",
+}
+
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+
+# o primeiro hasher gera os hashes novos, os outros so validam os antigos
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher
+    for name, hasher in PASSWORD_HASHER_CLASSES.items()
+    if name != PASSWORD_HASHER
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 390000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", 2**14))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", 102400))
+# quantos hashes rodam ao mesmo tempo por processo; cada um na thread da
+# requisicao, as demais esperam a vez
+PASSWORD_HASHING_CONCURRENCY = int(os.getenv("PASSWORD_HASHING_CONCURRENCY", 2))
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.AccountBackend"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -162,11 +292,54 @@ AUTH_USER_MODEL = "accounts.Account"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
+        "rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 2,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "NUM_PROXIES": THROTTLE_NUM_PROXIES,
+    "DEFAULT_THROTTLE_CLASSES": [
+        "utils.throttling.AnonReadThrottle",
+        "utils.throttling.SellerWriteThrottle",
+    ],
+    # token bucket: rajadas de ate N requisicoes, recarga de N por periodo;
+    # o login so gasta token quando as credenciais sao recusadas
+    "DEFAULT_THROTTLE_RATES": {
+        "anon_read": os.getenv("THROTTLE_ANON_READ", "300/min"),
+        "seller_write": os.getenv("THROTTLE_SELLER_WRITE", "120/min"),
+        "login": os.getenv("THROTTLE_LOGIN", "10/min"),
+    },
+}
+
+# MessagePack com "Accept: application/msgpack", se o pacote estiver instalado
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].insert(
+        1, "utils.renderers.MessagePackRenderer"
+    )
+
+# os claims do JWT sao aceitos sem consultar o banco: sem chave propria nao
+# ha como sair com uma chave conhecida
+JWT_SIGNING_KEY = os.getenv("JWT_SIGNING_KEY") or os.getenv("SECRET_KEY")
+if not JWT_SIGNING_KEY:
+    raise ImproperlyConfigured("Set JWT_SIGNING_KEY or SECRET_KEY.")
+
+SIMPLE_JWT = {
+    # o refresh rele a conta: um rebaixamento vale em ate um access token
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", 5))
+    ),
+    "REFRESH_TOKEN_LIFETIME": timedelta(
+        days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", 1))
+    ),
+    "SIGNING_KEY": JWT_SIGNING_KEY,
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.AccountTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.AccountTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "accounts.authentication.AccountTokenUser",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -176,3 +349,7 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.1",
     "SERVE_INCLUDE_SCHEMA": False,
 }
+
+# /schema/ gera o schema uma vez por processo; com OPENAPI_SCHEMA_FILE le o
+# arquivo gerado no build (python manage.py spectacular --file schema.yml)
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE") or None
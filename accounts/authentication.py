@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.functional import cached_property
+from rest_framework.authentication import TokenAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+import uuid
+
+# v2: o cache guarda so os campos abaixo, nao mais o par (user, token) picklado
+TOKEN_KEY = "auth-token:v2:{}"
+
+
+def _cache():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def invalidate_tokens(*keys) -> None:
+    _cache().delete_many([TOKEN_KEY.format(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches only the account's pk and the flags
+    the permissions read, never the password hash. A hit rebuilds an
+    Account with the remaining fields deferred; reading one of them goes
+    to the database.
+    """
+
+    user_fields = (
+        "id",
+        "username",
+        "is_active",
+        "is_seller",
+        "is_staff",
+        "is_superuser",
+    )
+
+    def authenticate_credentials(self, key):
+        cache_key = TOKEN_KEY.format(key)
+        cached = _cache().get(cache_key)
+        if cached is not None:
+            return self.rebuild(key, cached)
+
+        # so guarda quando a validacao padrao passa
+        user, token = super().authenticate_credentials(key)
+        _cache().set(
+            cache_key,
+            {field: getattr(user, field) for field in self.user_fields},
+            timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT,
+        )
+        return (user, token)
+
+    def rebuild(self, key, cached: dict):
+        model = self.get_model()
+        user_model = model._meta.get_field("user").related_model
+        db = router.db_for_read(user_model)
+        # from_db espera os valores na ordem dos campos do model
+        fields = [
+            field.attname
+            for field in user_model._meta.concrete_fields
+            if field.attname in cached
+        ]
+        user = user_model.from_db(db, fields, [cached[field] for field in fields])
+        token = model.from_db(db, ("key", "user_id"), (key, user.pk))
+        token.user = user
+        return (user, token)
+
+
+class AccountTokenUser(TokenUser):
+    @cached_property
+    def id(self):
+        # mantem a comparacao com Account.id (uuid) nas permissions
+        return uuid.UUID(str(self.token[jwt_settings.USER_ID_CLAIM]))
+
+    @cached_property
+    def is_seller(self):
+        return self.token.get("is_seller", False)
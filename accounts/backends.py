@@ -0,0 +1,27 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .hashers import hash_password, needs_rehash, verify_password
+from .models import Account
+
+
+class AccountBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Account.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+
+        try:
+            user = Account._default_manager.get_by_natural_key(username)
+        except Account.DoesNotExist:
+            # mesmo custo de hash para usuarios inexistentes (#20760 do django)
+            hash_password(password)
+            return
+
+        if not verify_password(password, user.password):
+            return
+        if needs_rehash(user.password):
+            user.password = hash_password(password)
+            user.save(update_fields=["password"])
+        if self.user_can_authenticate(user):
+            return user
@@ -0,0 +1,73 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+
+# os hashers mantem o nome do algoritmo do django, entao hashes antigos continuam
+# validos e mudar o custo so dispara o rehash no proximo login (must_update)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # lidos a cada hash: override_settings e mudancas em runtime valem
+    @property
+    def iterations(self):
+        return getattr(
+            settings, "PASSWORD_PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations
+        )
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return getattr(
+            settings, "PASSWORD_SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor
+        )
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return getattr(
+            settings, "PASSWORD_ARGON2_TIME_COST", Argon2PasswordHasher.time_cost
+        )
+
+    @property
+    def memory_cost(self):
+        return getattr(
+            settings, "PASSWORD_ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost
+        )
+
+
+# o hash roda na propria thread da requisicao; o semaforo so limita quantos
+# rodam ao mesmo tempo por processo (hashlib e argon2 liberam o GIL), para
+# uma rajada de cadastros nao tomar todos os nucleos do worker
+_hashing_slots = threading.BoundedSemaphore(
+    getattr(settings, "PASSWORD_HASHING_CONCURRENCY", 2)
+)
+
+
+def hash_password(password: str) -> str:
+    with _hashing_slots:
+        return make_password(password)
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    with _hashing_slots:
+        return check_password(password, encoded)
+
+
+def needs_rehash(encoded: str) -> bool:
+    preferred = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,61 @@
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from accounts.authentication import CachedTokenAuthentication
+from accounts.models import Account
+from accounts.serializers import AccountTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = "Compares per-request authentication cost of the token and JWT schemes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+
+        with transaction.atomic():
+            account = Account.objects.create_user(
+                username="bench-auth",
+                password="bench-auth",
+                first_name="bench",
+                last_name="auth",
+                is_seller=True,
+            )
+            token = Token.objects.create(user=account)
+            access = AccountTokenObtainPairSerializer.get_token(account).access_token
+            cache.clear()
+
+            schemes = [
+                ("token", TokenAuthentication(), f"Token {token.key}"),
+                ("cached token", CachedTokenAuthentication(), f"Token {token.key}"),
+                ("jwt", JWTStatelessUserAuthentication(), f"Bearer {access}"),
+            ]
+            for name, authentication, header in schemes:
+                self.run_scheme(name, authentication, header, total)
+
+            transaction.set_rollback(True)
+
+    def run_scheme(self, name, authentication, header, total):
+        request = Request(APIRequestFactory().get("/", HTTP_AUTHORIZATION=header))
+
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            for _ in range(total):
+                authentication.authenticate(request)
+            elapsed = perf_counter() - start
+
+        self.stdout.write(
+            f"{name:>12}: {elapsed / total * 1e6:8.1f} us/request, "
+            f"{len(queries) / total:.2f} queries/request"
+        )
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = "Measures signups/second per core for each configured password hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hashes", type=int, default=20)
+        parser.add_argument("--threads", type=int, default=4)
+
+    def handle(self, *args, **options):
+        total = options["hashes"]
+
+        for name, path in settings.PASSWORD_HASHER_CLASSES.items():
+            hasher = import_string(path)()
+            try:
+                hasher.encode("bench-hashing", hasher.salt())
+            except ValueError as error:
+                self.stdout.write(f"{name:>8}: skipped ({error})")
+                continue
+
+            single = self.run(hasher, total, threads=1)
+            pooled = self.run(hasher, total, threads=options["threads"])
+            self.stdout.write(
+                f"{name:>8}: {single:7.1f} signups/s on one core, "
+                f"{pooled:7.1f} signups/s with {options['threads']} threads"
+            )
+
+    def run(self, hasher, total: int, threads: int) -> float:
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(
+                executor.map(
+                    lambda _: hasher.encode("bench-hashing", hasher.salt()),
+                    range(total),
+                )
+            )
+        return total / (perf_counter() - start)
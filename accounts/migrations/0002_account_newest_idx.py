@@ -0,0 +1,19 @@
+# Generated by Django 4.1.2 on 2026-10-17 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["-date_joined", "id"], name="account_newest_idx"
+            ),
+        ),
+    ]
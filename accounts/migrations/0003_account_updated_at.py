@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_newest_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
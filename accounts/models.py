@@ -9,5 +9,11 @@ class Account(AbstractUser):
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
     is_seller = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     REQUIRED_FIELDS = ["first_name", "last_name"]
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["-date_joined", "id"], name="account_newest_idx"),
+        ]
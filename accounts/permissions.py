@@ -1,6 +1,7 @@
 from rest_framework.permissions import BasePermission
 from rest_framework.views import Request, View
 from accounts.models import Account
+from products.models import SellerInventory
 
 
 class AccountOwner(BasePermission):
@@ -8,3 +9,10 @@ class AccountOwner(BasePermission):
         self, request: Request, view: View, account: Account
     ) -> bool:
         return request.user == account
+
+
+class InventoryOwner(BasePermission):
+    def has_object_permission(
+        self, request: Request, view: View, inventory: SellerInventory
+    ) -> bool:
+        return request.user.pk == inventory.seller_id
@@ -1,6 +1,14 @@
 from rest_framework import serializers
 from .models import Account
 from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .hashers import hash_password
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -16,6 +24,7 @@ class AccountSerializer(serializers.ModelSerializer):
             "date_joined",
             "is_superuser",
             "is_active",
+            "updated_at",
         ]
         extra_kwargs = {
             "is_superuser": {"read_only": True},
@@ -34,11 +43,61 @@ class AccountSerializer(serializers.ModelSerializer):
     is_active = serializers.BooleanField(default=True)
     # duas formas de resolver o problema de is active setado pra false
     # em ambiente de testes
-    # ou da forma da linha 34 sobscrevendo a model e colocando serializer 
+    # ou da forma da linha 34 sobscrevendo a model e colocando serializer
     # como default true
     # ou subscrevendo o validated_data no metodo de create
     # do jeito que esta comentado na parte abaixo
-    
+
     def create(self, validated_data: dict) -> Account:
         # validated_data['is_active'] = True
-        return Account.objects.create_user(**validated_data)
+        password = validated_data.pop("password")
+        account = Account(**validated_data)
+        account.username = Account.normalize_username(account.username)
+        account.password = hash_password(password)
+        account.save()
+        return account
+
+
+class AccountRefreshToken(RefreshToken):
+    """
+    Refresh token without privilege claims. Every access token minted from
+    it reads the account again, so a demoted or deactivated account loses
+    its rights at the next refresh, not when the refresh token expires.
+    """
+
+    # claims lidos pelas permissions sem carregar a Account
+    account_claims = ("username", "is_seller", "is_staff", "is_superuser")
+    account = None
+
+    @classmethod
+    def for_user(cls, user: Account):
+        token = super().for_user(user)
+        # no login a conta ja esta carregada
+        token.account = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        account = self.account
+        if account is None:
+            account = (
+                Account.objects.filter(
+                    pk=self.payload[jwt_settings.USER_ID_CLAIM], is_active=True
+                )
+                .only(*self.account_claims)
+                .first()
+            )
+        if account is None:
+            raise TokenError("Account is inactive or does not exist.")
+        for claim in self.account_claims:
+            access[claim] = getattr(account, claim)
+        return access
+
+
+class AccountTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = AccountRefreshToken
+
+
+class AccountTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = AccountRefreshToken
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_tokens
+from .models import Account
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance: Token, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=Account)
+def invalidate_account_tokens(sender, instance: Account, created: bool, **kwargs):
+    # senha, is_active ou is_seller podem ter mudado
+    if created:
+        return
+    keys = Token.objects.filter(user_id=instance.pk).values_list("key", flat=True)
+    invalidate_tokens(*keys)
@@ -0,0 +1,95 @@
+import os
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from utils import seed_catalog
+
+# insert no outbox de mudancas; o seq vem depois, na leitura do feed
+OUTBOX_QUERIES = 1
+
+
+class AccountQueryCountTest(APITestCase):
+    """
+    Query budgets for the account endpoints, checked against
+    PERF_SEED_ACCOUNTS seeded sellers.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.accounts_url = "/api/accounts/"
+        sellers = seed_catalog(
+            accounts=int(os.getenv("PERF_SEED_ACCOUNTS", 200)),
+            products=int(os.getenv("PERF_SEED_PRODUCTS", 1000)),
+        )
+        cls.seller = sellers[0]
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.account_data = {
+            "username": "vendedor",
+            "password": "abcd",
+            "first_name": "vende",
+            "last_name": "dor",
+            "is_seller": True,
+        }
+        cls.login_data = {"username": cls.seller.username, "password": "perf-seed"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+
+    def test_list_accounts_query_budget(self):
+        """
+        it should list accounts with a count and a page query
+        """
+        with self.assertNumQueries(2):
+            self.client.get(self.accounts_url)
+        with self.assertNumQueries(1):
+            self.client.get(self.accounts_url + "?pagination=cursor")
+        with self.assertNumQueries(2):
+            self.client.get(self.accounts_url + "newest/5/")
+
+    def test_register_account_query_budget(self):
+        """
+        it should check the username and insert the account and its change,
+        in a savepoint
+        """
+        with self.assertNumQueries(4 + OUTBOX_QUERIES):
+            self.client.post(self.accounts_url, self.account_data, format="json")
+
+    def test_login_query_budget(self):
+        """
+        it should load the account and its token
+        """
+        with self.assertNumQueries(2):
+            self.client.post("/api/login/", self.login_data, format="json")
+        with self.assertNumQueries(1):
+            self.client.post("/api/login/jwt/", self.login_data, format="json")
+
+    def test_update_account_query_budget(self):
+        """
+        it should update the account, invalidate its cached token and products
+        and record the change, in a savepoint
+        """
+        with self.assertNumQueries(7 + OUTBOX_QUERIES):
+            self.client.patch(
+                f"{self.accounts_url}{self.seller.id}/",
+                {"first_name": "alterado"},
+                format="json",
+                **self.credentials,
+            )
+
+    def test_logout_query_budget(self):
+        """
+        it should authenticate and delete the token
+        """
+        with self.assertNumQueries(2):
+            self.client.post("/api/logout/", **self.credentials)
+
+    def test_inventory_query_budget(self):
+        """
+        it should read the seller inventory with a single query
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f"{self.accounts_url}{self.seller.id}/inventory/", **self.credentials
+            )
+        self.assertEqual(response.data["sku_count"], self.seller.products.count())
@@ -1,6 +1,15 @@
 from rest_framework.test import APITestCase
 from accounts.models import Account
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from unittest import skipUnless
+from accounts.authentication import TOKEN_KEY, CachedTokenAuthentication
 
 
 class AccountModelTest(APITestCase):
@@ -67,6 +76,9 @@ class AccountViewTest(APITestCase):
         cls.get_url = "/api/accounts/"
         cls.get_newest_url = "/api/accounts/newest/"
         cls.login_url = "/api/login/"
+        cls.logout_url = "/api/logout/"
+        cls.jwt_login_url = "/api/login/jwt/"
+        cls.jwt_refresh_url = "/api/login/jwt/refresh/"
         cls.update_url = "/api/accounts/"
         cls.seller_data = {
             "username": "vendedor",
@@ -235,3 +247,240 @@ class AccountViewTest(APITestCase):
         self.assertEqual(self.buyer_data["last_name"], buyer["last_name"])
         self.assertEqual(self.buyer_data["is_seller"], buyer["is_seller"])
         self.assertEqual(buyer["is_superuser"], False)
+
+    def test_should_be_able_to_list_users_with_cursor_pagination(self):
+        """
+        it should be able to walk the users list with keyset pagination
+        """
+
+        self.client.post(self.register_url, self.seller_data)
+        self.client.post(self.register_url, self.buyer_data)
+        response = self.client.get(self.get_url + "?pagination=cursor&page_size=1")
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            self.buyer_data["username"], response.data["results"][0]["username"]
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            self.seller_data["username"], response.data["results"][0]["username"]
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_should_resolve_cached_token_without_queries(self):
+        """
+        it should resolve an already seen token without hitting the database
+        """
+        cache.clear()
+        self.client.post(self.register_url, self.seller_data)
+        token = self.client.post(self.login_url, self.seller_data).data["token"]
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(token)
+        with self.assertNumQueries(0):
+            user, auth = authentication.authenticate_credentials(token)
+            self.assertTrue(user.is_seller)
+            self.assertEqual(auth.user, user)
+        self.assertEqual(user.username, self.seller_data["username"])
+
+        # o hash da senha nao vai para o cache compartilhado
+        self.assertNotIn("password", user.__dict__)
+        cached = cache.get(TOKEN_KEY.format(token))
+        self.assertNotIn(Account.objects.get(pk=user.pk).password, cached)
+
+    def test_should_invalidate_cached_token_on_logout_and_deactivation(self):
+        """
+        it should stop accepting a cached token after logout or deactivation
+        """
+        cache.clear()
+        seller = self.client.post(self.register_url, self.seller_data).data
+        token = self.client.post(self.login_url, self.seller_data).data["token"]
+        credentials = {"HTTP_AUTHORIZATION": f"Token {token}"}
+        patch_url = f'{self.update_url}{seller["id"]}/'
+        self.client.patch(patch_url, self.updated, **credentials)
+
+        response = self.client.post(self.logout_url, **credentials)
+        self.assertEqual(204, response.status_code)
+        response = self.client.patch(patch_url, self.updated, **credentials)
+        self.assertEqual(401, response.status_code)
+
+        token = self.client.post(self.login_url, self.seller_data).data["token"]
+        credentials = {"HTTP_AUTHORIZATION": f"Token {token}"}
+        self.client.patch(patch_url, self.updated, **credentials)
+        account = Account.objects.get(pk=seller["id"])
+        account.is_active = False
+        account.save()
+        response = self.client.patch(patch_url, self.updated, **credentials)
+        self.assertEqual(401, response.status_code)
+
+    def test_should_be_able_to_update_with_jwt(self):
+        """
+        it should be able to login with jwt and update the own account
+        """
+        seller = self.client.post(self.register_url, self.seller_data).data
+        tokens = self.client.post(self.jwt_login_url, self.seller_data).data
+        refreshed = self.client.post(
+            self.jwt_refresh_url, {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(200, refreshed.status_code)
+
+        patch_url = f'{self.update_url}{seller["id"]}/'
+        credentials = {"HTTP_AUTHORIZATION": f'Bearer {refreshed.data["access"]}'}
+        response = self.client.patch(patch_url, self.updated, **credentials)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.updated["first_name"], response.data["first_name"])
+
+    def test_should_not_refresh_privileges_of_a_demoted_account(self):
+        """
+        it should mint refreshed access tokens from the current account row
+        """
+        seller = self.client.post(self.register_url, self.seller_data).data
+        tokens = self.client.post(self.jwt_login_url, self.seller_data).data
+        account = Account.objects.get(pk=seller["id"])
+        account.is_seller = False
+        account.save()
+
+        refreshed = self.client.post(
+            self.jwt_refresh_url, {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(200, refreshed.status_code)
+        response = self.client.post(
+            "/api/products/",
+            {"description": "Smartband", "price": 10, "quantity": 1},
+            format="json",
+            HTTP_AUTHORIZATION=f'Bearer {refreshed.data["access"]}',
+        )
+        self.assertEqual(403, response.status_code)
+
+        account.is_active = False
+        account.save()
+        refreshed = self.client.post(
+            self.jwt_refresh_url, {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(401, refreshed.status_code)
+
+    def test_should_not_logout_with_jwt(self):
+        """
+        it should answer 401 instead of failing when logging out with a jwt
+        """
+        self.client.post(self.register_url, self.seller_data)
+        tokens = self.client.post(self.jwt_login_url, self.seller_data).data
+        credentials = {"HTTP_AUTHORIZATION": f'Bearer {tokens["access"]}'}
+
+        response = self.client.post(self.logout_url, **credentials)
+        self.assertEqual(401, response.status_code)
+
+    def test_should_rehash_password_with_preferred_hasher_on_login(self):
+        """
+        it should upgrade a password hashed by a non preferred hasher on login
+        """
+        seller = self.client.post(self.register_url, self.seller_data).data
+        account = Account.objects.get(pk=seller["id"])
+        self.assertTrue(account.password.startswith("pbkdf2_sha256$"))
+
+        account.password = make_password(self.seller_data["password"], hasher="scrypt")
+        account.save()
+        response = self.client.post(self.login_url, self.seller_data)
+        self.assertEqual(200, response.status_code)
+        account.refresh_from_db()
+        self.assertTrue(account.password.startswith("pbkdf2_sha256$"))
+
+        response = self.client.post(
+            self.login_url, {**self.seller_data, "password": "errada"}
+        )
+        self.assertEqual(400, response.status_code)
+
+    def test_should_read_hasher_cost_from_settings_at_call_time(self):
+        """
+        it should hash with the current iteration count and upgrade on login
+        """
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            seller = self.client.post(self.register_url, self.seller_data).data
+        account = Account.objects.get(pk=seller["id"])
+        self.assertTrue(account.password.startswith("pbkdf2_sha256$1000$"))
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            response = self.client.post(self.login_url, self.seller_data)
+        self.assertEqual(200, response.status_code)
+        account.refresh_from_db()
+        self.assertTrue(account.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_should_answer_conditional_account_requests(self):
+        """
+        it should answer 304 for an unchanged list and 412 for stale updates
+        """
+        seller = self.client.post(self.register_url, self.seller_data).data
+        token = self.client.post(self.login_url, self.seller_data).data["token"]
+        credentials = {"HTTP_AUTHORIZATION": f"Token {token}"}
+
+        response = self.client.get(self.get_url)
+        etag = response["ETag"]
+        response = self.client.get(self.get_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+
+        patch_url = f'{self.update_url}{seller["id"]}/'
+        response = self.client.patch(
+            patch_url, self.updated, HTTP_IF_MATCH='"stale"', **credentials
+        )
+        self.assertEqual(412, response.status_code)
+        response = self.client.patch(patch_url, self.updated, **credentials)
+        self.assertEqual(200, response.status_code)
+        response = self.client.patch(
+            patch_url, self.updated, HTTP_IF_MATCH=response["ETag"], **credentials
+        )
+        self.assertEqual(200, response.status_code)
+
+        response = self.client.get(self.get_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres specific")
+class AccountQueryPlanTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # volume suficiente para o planner preferir o indice sozinho
+        now = timezone.now()
+        Account.objects.bulk_create(
+            Account(
+                username=f"conta{index}",
+                password="!",
+                date_joined=now - timedelta(minutes=index),
+            )
+            for index in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def explain_view(self, url: str) -> str:
+        """
+        EXPLAIN of the page query the view ran for url, as the views build it.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        sql = [
+            query["sql"]
+            for query in queries
+            if 'FROM "accounts_account"' in query["sql"] and "LIMIT" in query["sql"]
+        ][-1]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_newest_accounts_should_use_index(self):
+        """
+        it should plan the newest accounts listing without sorting the table
+        """
+        plan = self.explain_view("/api/accounts/newest/5/")
+        self.assertIn("account_newest_idx", plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_account_cursor_pages_should_use_index(self):
+        """
+        it should plan cursor pages of accounts without sorting the table
+        """
+        plan = self.explain_view("/api/accounts/?pagination=cursor")
+        self.assertIn("account_newest_idx", plan)
+        self.assertNotIn("Sort", plan)
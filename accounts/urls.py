@@ -1,11 +1,30 @@
 from django.urls import path
-from .views import acc_filter_newest_view, acc_view, acc_detail_view, acc_management_view
-from rest_framework.authtoken.views import obtain_auth_token
+from .views import (
+    acc_filter_newest_view,
+    acc_view,
+    acc_detail_view,
+    acc_inventory_view,
+    acc_management_view,
+    jwt_login_view,
+    login_view,
+    logout_view,
+)
+from rest_framework_simplejwt.views import token_refresh
 
 urlpatterns = [
-    path("login/", obtain_auth_token),
-    path("accounts/", acc_view),
-    path("accounts/newest/<int:num>/", acc_filter_newest_view),
-    path("accounts/<account_id>/", acc_detail_view),
-    path("accounts/<account_id>/management/", acc_management_view),
+    path("login/", login_view, name="login"),
+    path("logout/", logout_view, name="logout"),
+    path("login/jwt/", jwt_login_view, name="login-jwt"),
+    path("login/jwt/refresh/", token_refresh, name="login-jwt-refresh"),
+    path("accounts/", acc_view, name="account-list"),
+    path("accounts/newest/<int:num>/", acc_filter_newest_view, name="account-newest"),
+    path("accounts/<account_id>/", acc_detail_view, name="account-detail"),
+    path(
+        "accounts/<account_id>/inventory/", acc_inventory_view, name="account-inventory"
+    ),
+    path(
+        "accounts/<account_id>/management/",
+        acc_management_view,
+        name="account-management",
+    ),
 ]
@@ -1,23 +1,51 @@
 from rest_framework.generics import (
     ListCreateAPIView,
+    RetrieveAPIView,
     UpdateAPIView,
 )
 from .serializers import AccountSerializer
 from .models import Account
-from rest_framework.permissions import IsAdminUser
-from .permissions import AccountOwner
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.views import APIView, Request, Response, status
+from rest_framework.exceptions import NotFound
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .authentication import CachedTokenAuthentication
+from .permissions import AccountOwner, InventoryOwner
+from products.models import SellerInventory
+from products.serializers import SellerInventorySerializer
+import uuid
+from changes.mixins import OutboxMixin
+from utils import (
+    ConditionalListMixin,
+    ConditionalUpdateMixin,
+    FailedLoginThrottleMixin,
+    IdempotentCreateMixin,
+    OptInCursorPagination,
+    ReplicaReadMixin,
+)
 
 
-class AccountView(ListCreateAPIView):
+class AccountView(
+    ReplicaReadMixin,
+    IdempotentCreateMixin,
+    ConditionalListMixin,
+    OutboxMixin,
+    ListCreateAPIView,
+):
     serializer_class = AccountSerializer
+    outbox_serializer_class = AccountSerializer
     queryset = Account.objects.all()
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ("-date_joined", "id")
 
 
 acc_view = AccountView.as_view()
 
 
-class AccountFilterNewestView(ListCreateAPIView):
+class AccountFilterNewestView(OutboxMixin, ListCreateAPIView):
     serializer_class = AccountSerializer
+    outbox_serializer_class = AccountSerializer
     queryset = Account.objects.all()
 
     def get_queryset(self):
@@ -28,8 +56,9 @@ class AccountFilterNewestView(ListCreateAPIView):
 acc_filter_newest_view = AccountFilterNewestView.as_view()
 
 
-class AccountDetailView(UpdateAPIView):
+class AccountDetailView(ConditionalUpdateMixin, OutboxMixin, UpdateAPIView):
     serializer_class = AccountSerializer
+    outbox_serializer_class = AccountSerializer
     queryset = Account.objects.all()
     lookup_url_kwarg = "account_id"
     permission_classes = [AccountOwner]
@@ -43,11 +72,59 @@ class AccountDetailView(UpdateAPIView):
 acc_detail_view = AccountDetailView.as_view()
 
 
-class AccountManagementView(UpdateAPIView):
+class AccountInventoryView(RetrieveAPIView):
+    serializer_class = SellerInventorySerializer
+    permission_classes = [IsAuthenticated, InventoryOwner]
+    lookup_url_kwarg = "account_id"
+
+    def get_object(self):
+        try:
+            seller_id = uuid.UUID(self.kwargs[self.lookup_url_kwarg])
+        except ValueError:
+            raise NotFound()
+
+        # vendedor sem produtos ainda nao tem linha agregada
+        inventory = SellerInventory(seller_id=seller_id)
+        self.check_object_permissions(self.request, inventory)
+        return SellerInventory.objects.filter(seller_id=seller_id).first() or inventory
+
+
+acc_inventory_view = AccountInventoryView.as_view()
+
+
+class AccountManagementView(OutboxMixin, UpdateAPIView):
     serializer_class = AccountSerializer
+    outbox_serializer_class = AccountSerializer
     queryset = Account.objects.all()
     lookup_url_kwarg = "account_id"
     permission_classes = [IsAdminUser]
 
 
 acc_management_view = AccountManagementView.as_view()
+
+
+class LoginView(FailedLoginThrottleMixin, ObtainAuthToken):
+    pass
+
+
+login_view = LoginView.as_view()
+
+
+class JWTLoginView(FailedLoginThrottleMixin, TokenObtainPairView):
+    pass
+
+
+jwt_login_view = JWTLoginView.as_view()
+
+
+class LogoutView(APIView):
+    # logout apaga o Token; um JWT e stateless e nao tem o que apagar
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+logout_view = LogoutView.as_view()
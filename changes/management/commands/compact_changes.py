@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from changes.outbox import compact_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes changes older than --hours that a newer change of the same "
+        "object supersedes. Meant to run periodically (cron, scheduler)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours", type=int, default=settings.CHANGE_FEED_RETENTION_HOURS
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options["hours"])
+        deleted = compact_changes(before, options["batch_size"])
+        self.stdout.write(f"compacted {deleted} superseded changes")
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.2 on 2026-10-17 18:13
+
+from django.db import migrations, models
+import rest_framework.utils.encoders
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Change",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                ("topic", models.CharField(max_length=50)),
+                ("object_id", models.UUIDField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("created", "Created"), ("updated", "Updated")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="change",
+            index=models.Index(fields=["topic", "seq"], name="change_topic_seq_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="change",
+            index=models.Index(
+                fields=["topic", "object_id", "seq"], name="change_object_seq_idx"
+            ),
+        ),
+    ]
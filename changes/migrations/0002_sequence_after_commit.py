@@ -0,0 +1,49 @@
+# Generated by Django 4.1.2 on 2026-10-17 19:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_seq(apps, schema_editor):
+    # as linhas existentes ja foram gravadas em ordem de commit (sob o lock)
+    Change = apps.get_model("changes", "Change")
+    Change.objects.using(schema_editor.connection.alias).update(seq=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("changes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="change",
+            name="change_topic_seq_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="change",
+            name="change_object_seq_idx",
+        ),
+        migrations.RenameField(
+            model_name="change",
+            old_name="seq",
+            new_name="id",
+        ),
+        migrations.AddField(
+            model_name="change",
+            name="seq",
+            field=models.BigIntegerField(null=True, unique=True),
+        ),
+        migrations.RunPython(copy_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="change",
+            index=models.Index(fields=["topic", "seq"], name="change_topic_seq_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="change",
+            index=models.Index(
+                fields=["topic", "object_id", "seq"], name="change_object_seq_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import transaction
+
+from .models import Change
+from .outbox import record_changes
+
+
+class OutboxMixin:
+    # grava no outbox o que perform_create/perform_update salvam, na mesma
+    # transacao, serializado com outbox_serializer_class
+    outbox_serializer_class = None
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+            record_changes(
+                Change.Action.CREATED,
+                [serializer.instance],
+                self.outbox_serializer_class,
+            )
+
+    def perform_update(self, serializer):
+        # sem savepoint: o update do ConditionalUpdateMixin ja abre a transacao
+        with transaction.atomic(savepoint=False):
+            super().perform_update(serializer)
+            record_changes(
+                Change.Action.UPDATED,
+                [serializer.instance],
+                self.outbox_serializer_class,
+            )
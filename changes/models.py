@@ -0,0 +1,35 @@
+from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class Change(models.Model):
+    """
+    Outbox row written in the same transaction as the product or account
+    it describes. `seq` is given after commit, in the order the rows
+    became visible, and only grows, so consumers tail the feed with the
+    last seq they have seen (see changes.outbox.sequence_changes).
+    """
+
+    class Action(models.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+
+    id = models.BigAutoField(primary_key=True)
+    # nulo enquanto a transacao que gravou a linha nao foi sequenciada
+    seq = models.BigIntegerField(null=True, unique=True)
+    # model_name do objeto: "product" ou "account"
+    topic = models.CharField(max_length=50)
+    object_id = models.UUIDField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    # Decimal vira numero, como nas respostas da API
+    data = models.JSONField(encoder=JSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["topic", "seq"], name="change_topic_seq_idx"),
+            # compactacao: existe versao mais nova do mesmo objeto?
+            models.Index(
+                fields=["topic", "object_id", "seq"], name="change_object_seq_idx"
+            ),
+        ]
@@ -0,0 +1,87 @@
+from django.db import router, transaction
+from django.db.models import Exists, Max, OuterRef
+
+from .models import Change
+
+# chave do pg_advisory_xact_lock que serializa o sequence_changes
+LOCK_ID = 0x6F7574626F78
+
+
+def record_changes(action: str, instances, serializer_class) -> None:
+    """
+    Adds one outbox row per instance, serialized with `serializer_class`,
+    inside the transaction that wrote the instances: the change commits or
+    rolls back with them. The rows get their seq from sequence_changes.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    serializer = serializer_class()
+    Change.objects.bulk_create(
+        Change(
+            topic=instance._meta.model_name,
+            object_id=instance.pk,
+            action=action,
+            data=serializer.to_representation(instance),
+        )
+        for instance in instances
+    )
+
+
+def sequence_changes(batch_size: int = 1000) -> int:
+    """
+    Gives the committed changes that have no seq yet the next ones, in
+    batches. Only committed rows are visible here and each run numbers
+    after the last, so a seq a reader has seen is never followed by a
+    smaller one. The lock is held by this short transaction only, never
+    by the writes, which insert their changes without waiting on each
+    other. Returns how many rows were sequenced.
+    """
+    using = router.db_for_write(Change)
+    sequenced = 0
+    while True:
+        with transaction.atomic(using=using):
+            connection = transaction.get_connection(using)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [LOCK_ID])
+            changes = Change.objects.using(using)
+            pending = list(
+                changes.filter(seq=None).order_by("id").only("id")[:batch_size]
+            )
+            if not pending:
+                return sequenced
+            last = changes.aggregate(last=Max("seq"))["last"] or 0
+            for offset, change in enumerate(pending, start=1):
+                change.seq = last + offset
+            changes.bulk_update(pending, ["seq"])
+        sequenced += len(pending)
+
+
+def compact_changes(before, batch_size: int = 1000) -> int:
+    """
+    Deletes changes older than `before` that a newer change of the same
+    object supersedes. The latest change of every object is kept, so a
+    consumer starting from since=0 still rebuilds the current state.
+    Returns how many rows were deleted.
+    """
+    # numera as pendentes antes, para contarem como versao mais nova
+    sequence_changes(batch_size)
+    newer = Change.objects.filter(
+        topic=OuterRef("topic"),
+        object_id=OuterRef("object_id"),
+        seq__gt=OuterRef("seq"),
+    )
+    superseded = (
+        Change.objects.filter(Exists(newer), created_at__lt=before)
+        .order_by("seq")
+        .values_list("seq", flat=True)
+    )
+    deleted = 0
+    # em lotes, para nao segurar locks sobre a tabela inteira
+    while True:
+        seqs = list(superseded[:batch_size])
+        if not seqs:
+            return deleted
+        deleted += Change.objects.filter(seq__in=seqs).delete()[0]
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from .models import Change
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    # o feed so lista linhas ja sequenciadas
+    seq = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Change
+        fields = ["seq", "topic", "object_id", "action", "created_at", "data"]
+        read_only_fields = fields
@@ -0,0 +1,278 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from changes.models import Change
+from changes.outbox import compact_changes, sequence_changes
+from products.models import Product
+
+
+class ChangeFeedTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.changes_url = "/api/changes/"
+        cls.products_url = "/api/products/"
+        cls.admin = Account.objects.create_superuser(
+            username="admin", password="abcd", first_name="ad", last_name="min"
+        )
+        cls.seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.admin_token = Token.objects.create(user=cls.admin)
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.product_data = {
+            "description": "Smartband XYZ 3.0",
+            "price": 100.99,
+            "quantity": 12,
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        self.admin_credentials = {"HTTP_AUTHORIZATION": f"Token {self.admin_token.key}"}
+
+    def create_product(self, **data):
+        response = self.client.post(
+            self.products_url,
+            {**self.product_data, **data},
+            format="json",
+            **self.credentials,
+        )
+        self.assertEqual(201, response.status_code)
+        return response.json()
+
+    def feed(self, query=""):
+        response = self.client.get(self.changes_url + query, **self.admin_credentials)
+        self.assertEqual(200, response.status_code)
+        return response.json()
+
+    def test_should_record_product_creates_and_updates(self):
+        """
+        it should add a change per product write, in commit order, with the
+        product as the list endpoint serializes it
+        """
+        product = self.create_product()
+        self.client.patch(
+            f"{self.products_url}{product['id']}/",
+            {"price": 90.5},
+            format="json",
+            **self.credentials,
+        )
+        self.client.post(
+            self.products_url + "reserve/",
+            [{"id": product["id"], "quantity": 2}],
+            format="json",
+            **self.credentials,
+        )
+
+        changes = self.feed("?topic=product")["results"]
+        self.assertEqual(
+            ["created", "updated", "updated"], [c["action"] for c in changes]
+        )
+        self.assertEqual({product["id"]}, {c["object_id"] for c in changes})
+        self.assertEqual([100.99, 90.5, 90.5], [c["data"]["price"] for c in changes])
+        self.assertEqual(10, changes[-1]["data"]["quantity"])
+        self.assertEqual(str(self.seller.id), changes[0]["data"]["seller_id"])
+        self.assertLess(changes[0]["seq"], changes[1]["seq"])
+
+    def test_should_record_bulk_writes(self):
+        """
+        it should add one change per row created or updated in bulk
+        """
+        product = self.create_product()
+        since = self.feed()["next_since"]
+        response = self.client.post(
+            self.products_url + "bulk/",
+            [self.product_data, {"id": product["id"], "quantity": 1}],
+            format="json",
+            **self.credentials,
+        )
+        self.assertEqual(201, response.status_code)
+
+        changes = self.feed(f"?since={since}")["results"]
+        self.assertEqual(["created", "updated"], [c["action"] for c in changes])
+        self.assertEqual(1, changes[1]["data"]["quantity"])
+
+    def test_should_record_account_creates_and_updates(self):
+        """
+        it should add account changes without the password
+        """
+        response = self.client.post(
+            "/api/accounts/",
+            {
+                "username": "comprador",
+                "password": "abcd",
+                "first_name": "compra",
+                "last_name": "dor",
+                "is_seller": False,
+            },
+            format="json",
+        )
+        account_id = response.json()["id"]
+        self.client.patch(
+            f"/api/accounts/{account_id}/management/",
+            {"is_active": False},
+            format="json",
+            **self.admin_credentials,
+        )
+
+        changes = self.feed("?topic=account")["results"]
+        self.assertEqual(["created", "updated"], [c["action"] for c in changes])
+        self.assertEqual("comprador", changes[0]["data"]["username"])
+        self.assertNotIn("password", changes[0]["data"])
+        self.assertFalse(changes[1]["data"]["is_active"])
+
+    def test_should_roll_back_the_write_with_its_change(self):
+        """
+        it should not keep the product when its change cannot be recorded
+        """
+        with mock.patch(
+            "changes.outbox.Change.objects.bulk_create", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.create_product()
+
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Change.objects.exists())
+
+    def test_should_page_through_the_feed_with_since(self):
+        """
+        it should return changes after `since`, a next link while pages are
+        full and the seq to resume from
+        """
+        for number in range(3):
+            self.create_product(description=f"produto {number}")
+        sequence_changes()
+        seqs = list(Change.objects.order_by("seq").values_list("seq", flat=True))
+
+        first = self.feed("?limit=2")
+        self.assertEqual(seqs[:2], [c["seq"] for c in first["results"]])
+        self.assertEqual(seqs[1], first["next_since"])
+        self.assertIn(f"since={seqs[1]}", first["next"])
+
+        second = self.feed(f"?limit=2&since={first['next_since']}")
+        self.assertEqual(seqs[2:], [c["seq"] for c in second["results"]])
+        self.assertIsNone(second["next"])
+
+        caught_up = self.feed(f"?since={second['next_since']}")
+        self.assertEqual([], caught_up["results"])
+        self.assertEqual(seqs[2], caught_up["next_since"])
+
+    def test_should_sequence_changes_when_the_feed_is_read(self):
+        """
+        it should leave writes unnumbered and number them in order on read
+        """
+        first = self.create_product()
+        self.assertEqual([None], list(Change.objects.values_list("seq", flat=True)))
+
+        changes = self.feed()["results"]
+        self.assertEqual([first["id"]], [c["object_id"] for c in changes])
+        self.assertIsNotNone(changes[0]["seq"])
+
+        second = self.create_product()
+        changes = self.feed(f"?since={changes[0]['seq']}")["results"]
+        self.assertEqual([second["id"]], [c["object_id"] for c in changes])
+
+    def test_should_number_late_commits_after_what_was_read(self):
+        """
+        it should give a change that committed late a seq after the ones a
+        reader has seen, even when its id is smaller
+        """
+        product = self.create_product()
+        seen = Change.objects.create(
+            id=10, topic="product", object_id=product["id"], action="updated", data={}
+        )
+        since = self.feed()["next_since"]
+        self.assertEqual(since, Change.objects.get(pk=seen.pk).seq)
+
+        late = Change.objects.create(
+            id=5, topic="product", object_id=product["id"], action="updated", data={}
+        )
+        changes = self.feed(f"?since={since}")["results"]
+        self.assertEqual([since + 1], [c["seq"] for c in changes])
+        self.assertEqual(since + 1, Change.objects.get(pk=late.pk).seq)
+
+    def test_should_validate_the_feed_parameters(self):
+        """
+        it should reject a bad since, limit or topic
+        """
+        for query in ("?since=-1", "?since=abc", "?limit=0", "?topic=order"):
+            response = self.client.get(
+                self.changes_url + query, **self.admin_credentials
+            )
+            self.assertEqual(400, response.status_code, query)
+
+    def test_should_only_serve_the_feed_to_admins(self):
+        """
+        it should not expose the feed to sellers or anonymous clients
+        """
+        self.assertEqual(401, self.client.get(self.changes_url).status_code)
+        response = self.client.get(self.changes_url, **self.credentials)
+        self.assertEqual(403, response.status_code)
+
+
+class CompactChangesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+
+    def record(self, product, action, hours_ago):
+        change = Change.objects.create(
+            topic="product",
+            object_id=product.id,
+            action=action,
+            data={"quantity": product.quantity},
+        )
+        created_at = timezone.now() - timedelta(hours=hours_ago)
+        Change.objects.filter(pk=change.pk).update(created_at=created_at)
+        sequence_changes()
+        change.refresh_from_db()
+        return change.seq
+
+    def test_should_drop_only_old_superseded_changes(self):
+        """
+        it should keep the latest change of every object and everything
+        newer than the retention window
+        """
+        old, recent = [
+            Product.objects.create(
+                seller=self.seller, description="p", price=Decimal("1"), quantity=1
+            )
+            for _ in range(2)
+        ]
+        superseded = self.record(old, "created", hours_ago=10)
+        latest = self.record(old, "updated", hours_ago=9)
+        recent_created = self.record(recent, "created", hours_ago=1)
+        recent_updated = self.record(recent, "updated", hours_ago=0)
+
+        deleted = compact_changes(timezone.now() - timedelta(hours=5), batch_size=1)
+
+        self.assertEqual(1, deleted)
+        self.assertEqual(
+            [latest, recent_created, recent_updated],
+            list(Change.objects.order_by("seq").values_list("seq", flat=True)),
+        )
+        self.assertNotIn(superseded, Change.objects.values_list("seq", flat=True))
+
+    def test_should_compact_from_the_command(self):
+        """
+        it should compact with the configured retention from the command line
+        """
+        product = Product.objects.create(
+            seller=self.seller, description="p", price=Decimal("1"), quantity=1
+        )
+        self.record(product, "created", hours_ago=24 * 30)
+        latest = self.record(product, "updated", hours_ago=24 * 30)
+
+        call_command("compact_changes", stdout=mock.Mock())
+
+        self.assertEqual([latest], list(Change.objects.values_list("seq", flat=True)))
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import change_feed_view
+
+urlpatterns = [
+    path("changes/", change_feed_view, name="change-feed"),
+]
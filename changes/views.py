@@ -0,0 +1,44 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAdminUser
+
+from utils import ReplicaReadMixin, SincePagination
+
+from .models import Change
+from .outbox import sequence_changes
+from .serializers import ChangeSerializer
+
+TOPICS = ("account", "product")
+
+
+class ChangeFeedView(ReplicaReadMixin, ListAPIView):
+    """
+    Product and account creates/updates in commit order; a change gets
+    its seq once committed, when the feed is next read. Tail it with
+    `?since=<next_since>`; `?topic=product` or `account` narrows it down.
+    Superseded changes are compacted after CHANGE_FEED_RETENTION_HOURS,
+    the latest one of each object stays.
+    """
+
+    serializer_class = ChangeSerializer
+    queryset = Change.objects.all()
+    permission_classes = [IsAdminUser]
+    pagination_class = SincePagination
+    since_field = "seq"
+
+    def list(self, request, *args, **kwargs):
+        # numera no primario o que ja commitou; a replica recebe em ordem
+        sequence_changes()
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        topic = self.request.query_params.get("topic")
+        if topic is None:
+            return queryset
+        if topic not in TOPICS:
+            raise ValidationError({"topic": [f"Expected one of {list(TOPICS)}."]})
+        return queryset.filter(topic=topic)
+
+
+change_feed_view = ChangeFeedView.as_view()
@@ -0,0 +1,19 @@
+import os
+
+# SERVER_MODE=asgi serve as mesmas rotas com workers uvicorn: a cadeia de
+# middlewares e async e cada view DRF roda no pool de threads do handler, so
+# enquanto executa; o envio para clientes lentos fica no event loop
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "_komercio.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "_komercio.wsgi:application"
+    # cada thread mantem sua conexao (ou slot do pool) com o banco
+    threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+
+def post_worker_init(worker):
+    # gera o schema OpenAPI antes do worker aceitar requisicoes
+    from utils.schema import CachedSpectacularAPIView
+
+    CachedSpectacularAPIView.load_schema()
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+DETAIL_KEY = "product-detail:{}"
+HITS_KEY = "product-detail:hits"
+MISSES_KEY = "product-detail:misses"
+
+
+def _cache():
+    return caches[settings.PRODUCT_CACHE_ALIAS]
+
+
+def _count(key: str) -> None:
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_product_detail(product_id):
+    data = _cache().get(DETAIL_KEY.format(product_id))
+    _count(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_product_detail(product_id, data: dict, timeout: int = None) -> None:
+    _cache().set(
+        DETAIL_KEY.format(product_id),
+        data,
+        timeout=settings.PRODUCT_CACHE_TIMEOUT if timeout is None else timeout,
+    )
+
+
+def invalidate_product_detail(*product_ids) -> None:
+    keys = [DETAIL_KEY.format(pk) for pk in product_ids]
+    _cache().delete_many(keys)
+    # dentro de uma transacao, uma leitura antes do commit ainda ve a versao
+    # antiga e pode coloca-la de volta no cache: apaga de novo apos o commit
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def product_cache_stats() -> dict:
+    values = _cache().get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": values.get(HITS_KEY, 0),
+        "misses": values.get(MISSES_KEY, 0),
+    }
@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Now
+
+from utils.fields import MoneyField
+
+from .models import Product, SellerInventory
+
+
+def inventory_deltas(changes) -> dict:
+    # changes: pares (antes, depois) de snapshots, None quando nao existe
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            seller_id, quantity, price = state
+            delta = deltas[seller_id]
+            delta[0] += sign
+            delta[1] += sign * quantity
+            delta[2] += sign * quantity * price
+    return {seller_id: delta for seller_id, delta in deltas.items() if any(delta)}
+
+
+def apply_inventory_deltas(deltas: dict, create: bool = True) -> None:
+    for seller_id, (skus, units, value) in deltas.items():
+        updated = SellerInventory.objects.filter(seller_id=seller_id).update(
+            sku_count=F("sku_count") + skus,
+            units_in_stock=F("units_in_stock") + units,
+            # o literal precisa ser convertido para centavos como a coluna
+            stock_value=F("stock_value") + Value(value, output_field=MoneyField()),
+        )
+        if updated or not create:
+            continue
+        try:
+            with transaction.atomic():
+                SellerInventory.objects.create(
+                    seller_id=seller_id,
+                    sku_count=skus,
+                    units_in_stock=units,
+                    stock_value=value,
+                )
+        except IntegrityError:
+            # outra requisicao criou a linha primeiro
+            apply_inventory_deltas({seller_id: (skus, units, value)}, create=False)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids: list):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+def reserve_stock(items: dict) -> list:
+    """
+    Decrements every product in `items` ({product_id: quantity}) with a
+    conditional UPDATE, all or nothing. Raises InsufficientStock with the
+    products that are missing, inactive or short on stock.
+    """
+    with transaction.atomic():
+        failed = []
+        # ordem fixa para reservas concorrentes travarem as linhas na mesma ordem
+        for product_id in sorted(items):
+            quantity = items[product_id]
+            reserved = Product.objects.filter(
+                pk=product_id, is_active=True, quantity__gte=quantity
+            ).update(quantity=F("quantity") - quantity, updated_at=Now())
+            if not reserved:
+                failed.append(product_id)
+        if failed:
+            raise InsufficientStock(failed)
+
+        # as linhas ja estao travadas pelo UPDATE, o preco lido e consistente
+        rows = list(
+            Product.objects.filter(pk__in=items).values_list(
+                "id", "seller_id", "quantity", "price"
+            )
+        )
+        changes = [
+            (
+                (seller_id, quantity + items[product_id], price),
+                (seller_id, quantity, price),
+            )
+            for product_id, seller_id, quantity, price in rows
+        ]
+        apply_inventory_deltas(inventory_deltas(changes))
+    return rows
+
+
+def rebuild_inventory(seller_ids=None) -> None:
+    products = Product.objects.all()
+    if seller_ids is not None:
+        products = products.filter(seller_id__in=seller_ids)
+        SellerInventory.objects.filter(seller_id__in=seller_ids).delete()
+    else:
+        SellerInventory.objects.all().delete()
+
+    totals = products.values("seller_id").annotate(
+        sku_count=Count("id"),
+        units_in_stock=Sum("quantity"),
+        stock_value=Sum(F("quantity") * F("price"), output_field=MoneyField()),
+    )
+    SellerInventory.objects.bulk_create(
+        [SellerInventory(**total) for total in totals], batch_size=1000
+    )
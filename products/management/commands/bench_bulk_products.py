@@ -0,0 +1,49 @@
+import json
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import Account
+from products.views import product_bulk_view
+
+
+class Command(BaseCommand):
+    help = "Measures bulk product import throughput in rows/second."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        payload = "\n".join(
+            json.dumps(
+                {"description": f"Produto {row}", "price": 10.5, "quantity": row}
+            )
+            for row in range(rows)
+        )
+
+        with transaction.atomic():
+            seller = Account.objects.create_user(
+                username="bench-bulk",
+                password="bench-bulk",
+                first_name="bench",
+                last_name="bulk",
+                is_seller=True,
+            )
+            request = APIRequestFactory().post(
+                "/api/products/bulk/", payload, content_type="application/x-ndjson"
+            )
+            force_authenticate(request, user=seller)
+
+            start = perf_counter()
+            response = product_bulk_view(request)
+            elapsed = perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{response.data['created']} rows in {elapsed:.2f}s "
+            f"({response.data['created'] / elapsed:,.0f} rows/second)"
+        )
@@ -0,0 +1,55 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+from products.serializers import ProductSerializer
+from utils import FastJSONRenderer, ValuesListSerializer, percentile, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares ProductSerializer on model instances against the values() "
+        "fast path on pages of --rows products (query time excluded)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--runs", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows, runs = options["rows"], options["runs"]
+
+        with transaction.atomic():
+            seed_catalog(accounts=10, products=rows)
+            products = Product.objects.order_by("id")
+            instances = list(products)
+            values = list(
+                products.values(*ValuesListSerializer.lookups(ProductSerializer()))
+            )
+            transaction.set_rollback(True)
+
+        paths = {
+            "ModelSerializer + JSONRenderer": (instances, JSONRenderer()),
+            "values() + FastJSONRenderer": (values, FastJSONRenderer()),
+        }
+        outputs = {}
+        for name, (page, renderer) in paths.items():
+            serialize, render = [], []
+            for _ in range(runs):
+                start = perf_counter()
+                data = ProductSerializer(page, many=True).data
+                middle = perf_counter()
+                outputs[name] = renderer.render({"results": data})
+                serialize.append((middle - start) * 1000)
+                render.append((perf_counter() - middle) * 1000)
+
+            self.stdout.write(
+                f"{name:>31}: serialize p50 {percentile(serialize, 0.5):7.2f}ms, "
+                f"render p50 {percentile(render, 0.5):7.2f}ms"
+            )
+
+        identical = len(set(outputs.values())) == 1
+        self.stdout.write(f"byte-identical output: {identical}")
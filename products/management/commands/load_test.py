@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+
+from utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent GETs at a running server. Run it against the WSGI "
+        "and the ASGI (SERVER_MODE=asgi) deployments to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=100)
+
+    def handle(self, *args, **options):
+        url = options["url"]
+
+        def fetch(_):
+            start = perf_counter()
+            try:
+                with urlopen(url) as response:
+                    response.read()
+                    status = response.status
+            except HTTPError as error:
+                status = error.code
+            return status, (perf_counter() - start) * 1000
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(fetch, range(options["requests"])))
+        elapsed = perf_counter() - start
+
+        latencies = [latency for _, latency in results]
+        errors = sum(1 for status, _ in results if status >= 400)
+        self.stdout.write(
+            f"{len(results)} requests in {elapsed:.2f}s "
+            f"({len(results) / elapsed:,.0f} req/s), "
+            f"p50 {percentile(latencies, 0.50):.1f}ms, "
+            f"p95 {percentile(latencies, 0.95):.1f}ms, {errors} errors"
+        )
@@ -0,0 +1,195 @@
+import json
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts import urls as account_urls
+from accounts.serializers import AccountTokenObtainPairSerializer
+from products import urls as product_urls
+from products.models import Product
+from utils import percentile, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a catalog, times every account/product endpoint and writes "
+        "p50/p95 latencies to a JSON baseline. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--accounts", type=int, default=10_000)
+        parser.add_argument("--products", type=int, default=1_000_000)
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument("--output", default="perf_baseline.json")
+        parser.add_argument(
+            "--compare",
+            help="Previous baseline; fails if any p95 grew beyond --tolerance.",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write("seeding catalog...")
+            sellers = seed_catalog(options["accounts"], options["products"])
+            seller = sellers[0]
+            product = seller.products.first()
+            token = Token.objects.create(user=seller)
+            # estoque suficiente para todas as execucoes das rotas de reserva
+            stocked = Product.objects.create(
+                seller=seller, description="perf", price=1.5, quantity=10**9
+            )
+            refresh = AccountTokenObtainPairSerializer.get_token(seller)
+
+            client = APIClient(SERVER_NAME="localhost")
+            credentials = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+
+            def logout_credentials():
+                # cada logout apaga o token, entao cada execucao usa um novo
+                logout_token, _ = Token.objects.get_or_create(user=sellers[-1])
+                return {"HTTP_AUTHORIZATION": f"Token {logout_token.key}"}
+
+            product_data = {"description": "perf", "price": 1.5, "quantity": 1}
+            login_data = {"username": seller.username, "password": "perf-seed"}
+
+            cases = {
+                "login/": ("post", "/api/login/", login_data, {}),
+                "logout/": ("post", "/api/logout/", None, logout_credentials),
+                "login/jwt/": ("post", "/api/login/jwt/", login_data, {}),
+                "login/jwt/refresh/": (
+                    "post",
+                    "/api/login/jwt/refresh/",
+                    {"refresh": str(refresh)},
+                    {},
+                ),
+                "accounts/": ("get", "/api/accounts/", None, {}),
+                "accounts/newest/<int:num>/": (
+                    "get",
+                    "/api/accounts/newest/10/",
+                    None,
+                    {},
+                ),
+                "accounts/<account_id>/": (
+                    "patch",
+                    f"/api/accounts/{seller.id}/",
+                    {"first_name": "perf"},
+                    credentials,
+                ),
+                "accounts/<account_id>/inventory/": (
+                    "get",
+                    f"/api/accounts/{seller.id}/inventory/",
+                    None,
+                    credentials,
+                ),
+                "accounts/<account_id>/management/": (
+                    "patch",
+                    f"/api/accounts/{seller.id}/management/",
+                    {"first_name": "perf"},
+                    credentials,
+                ),
+                "products/": ("get", "/api/products/", None, {}),
+                "products/bulk/": (
+                    "post",
+                    "/api/products/bulk/",
+                    [product_data] * 100,
+                    credentials,
+                ),
+                "products/export/": (
+                    "get",
+                    f"/api/products/export/?seller_id={seller.id}",
+                    None,
+                    {},
+                ),
+                "products/reserve/": (
+                    "post",
+                    "/api/products/reserve/",
+                    [{"id": str(stocked.id), "quantity": 1}],
+                    credentials,
+                ),
+                "products/<product_id>/": (
+                    "get",
+                    f"/api/products/{product.id}/",
+                    None,
+                    {},
+                ),
+                "products/<product_id>/reserve/": (
+                    "post",
+                    f"/api/products/{stocked.id}/reserve/",
+                    {"quantity": 1},
+                    credentials,
+                ),
+                "accounts/<account_id>/products/": (
+                    "get",
+                    f"/api/accounts/{seller.id}/products/",
+                    None,
+                    {},
+                ),
+            }
+            self.check_coverage(cases)
+
+            results = {}
+            for route, (method, url, data, headers) in cases.items():
+                results[route] = self.measure(
+                    client, method, url, data, headers, options["runs"]
+                )
+                self.stdout.write(
+                    f"{method.upper():>6} {url}: p50 {results[route]['p50_ms']}ms "
+                    f"p95 {results[route]['p95_ms']}ms "
+                    f"{results[route]['queries']} queries"
+                )
+
+            transaction.set_rollback(True)
+
+        with open(options["output"], "w") as baseline:
+            json.dump(results, baseline, indent=2, sort_keys=True)
+
+        if options["compare"]:
+            self.compare(results, options["compare"], options["tolerance"])
+
+    def check_coverage(self, cases: dict) -> None:
+        routes = {
+            str(pattern.pattern)
+            for pattern in account_urls.urlpatterns + product_urls.urlpatterns
+        }
+        missing = routes - cases.keys()
+        if missing:
+            raise CommandError(f"No perf case for routes: {sorted(missing)}")
+
+    def measure(self, client, method, url, data, headers, runs) -> dict:
+        samples = []
+        for _ in range(runs):
+            cache.clear()
+            run_headers = headers() if callable(headers) else headers
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                response = getattr(client, method)(
+                    url, data, format="json", **run_headers
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                samples.append((perf_counter() - start) * 1000)
+
+        return {
+            "method": method.upper(),
+            "status": response.status_code,
+            "queries": len(queries),
+            "p50_ms": round(percentile(samples, 0.50), 2),
+            "p95_ms": round(percentile(samples, 0.95), 2),
+        }
+
+    def compare(self, results: dict, path: str, tolerance: float) -> None:
+        with open(path) as baseline:
+            previous = json.load(baseline)
+
+        regressions = [
+            f"{route}: p95 {previous[route]['p95_ms']}ms -> {result['p95_ms']}ms"
+            for route, result in results.items()
+            if route in previous
+            and result["p95_ms"] > previous[route]["p95_ms"] * (1 + tolerance)
+        ]
+        if regressions:
+            raise CommandError("Latency regressions:\n" + "\n".join(regressions))
@@ -0,0 +1,58 @@
+# Generated by Django 4.1.2 on 2026-10-17 17:22
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# o trigger mantem o search_vector atualizado inclusive em bulk_create/bulk_update
+FORWARD_SQL = [
+    """
+    CREATE INDEX product_search_vector_idx
+    ON products_product USING gin (search_vector)
+    """,
+    """
+    CREATE TRIGGER product_search_vector_update
+    BEFORE INSERT OR UPDATE OF description ON products_product
+    FOR EACH ROW EXECUTE FUNCTION
+    tsvector_update_trigger(search_vector, 'pg_catalog.simple', description)
+    """,
+    """
+    UPDATE products_product
+    SET search_vector = to_tsvector('pg_catalog.simple', description)
+    """,
+]
+
+BACKWARD_SQL = [
+    "DROP TRIGGER IF EXISTS product_search_vector_update ON products_product",
+    "DROP INDEX IF EXISTS product_search_vector_idx",
+]
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_product_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL),
+            run_postgres_sql(BACKWARD_SQL),
+        ),
+    ]
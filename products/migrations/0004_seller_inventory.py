@@ -0,0 +1,52 @@
+# Generated by Django 4.1.2 on 2026-10-17 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_inventory(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    SellerInventory = apps.get_model("products", "SellerInventory")
+
+    totals = Product.objects.values("seller_id").annotate(
+        sku_count=models.Count("id"),
+        units_in_stock=models.Sum("quantity"),
+        stock_value=models.Sum(
+            models.F("quantity") * models.F("price"),
+            output_field=models.FloatField(),
+        ),
+    )
+    SellerInventory.objects.bulk_create(
+        [SellerInventory(**total) for total in totals], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_newest_idx"),
+        ("products", "0003_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerInventory",
+            fields=[
+                (
+                    "seller",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="inventory",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("sku_count", models.IntegerField(default=0)),
+                ("units_in_stock", models.BigIntegerField(default=0)),
+                ("stock_value", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.1.2 on 2026-10-17 18:40
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Round
+import utils.fields
+
+
+def price_to_cents(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    db_alias = schema_editor.connection.alias
+    # 100.99 * 100 = 10098.999999999998: arredonda em vez de truncar
+    Product.objects.using(db_alias).update(price_cents=Round(models.F("price") * 100))
+
+
+def cents_to_price(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    db_alias = schema_editor.connection.alias
+    Product.objects.using(db_alias).update(
+        price=Cast("price_cents", output_field=models.FloatField()) / 100
+    )
+
+
+def rebuild_stock_value(apps, schema_editor):
+    # recalcula a partir dos produtos: os totais em float acumularam erro
+    Product = apps.get_model("products", "Product")
+    SellerInventory = apps.get_model("products", "SellerInventory")
+    db_alias = schema_editor.connection.alias
+
+    SellerInventory.objects.using(db_alias).update(stock_value=0)
+    totals = (
+        Product.objects.using(db_alias)
+        .values("seller_id")
+        .annotate(
+            stock_value=models.Sum(
+                models.F("quantity") * models.F("price"),
+                output_field=Product._meta.get_field("price").clone(),
+            )
+        )
+    )
+    SellerInventory.objects.using(db_alias).bulk_update(
+        [SellerInventory(**total) for total in totals],
+        ["stock_value"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_product_updated_at"),
+    ]
+
+    operations = [
+        # ao desfazer, roda por ultimo, com os campos float de volta
+        migrations.RunPython(migrations.RunPython.noop, rebuild_stock_value),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_active_price_idx",
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="price_cents",
+            field=models.BigIntegerField(null=True),
+        ),
+        # nulo so para a coluna poder ser recriada ao desfazer
+        migrations.AlterField(
+            model_name="product",
+            name="price",
+            field=models.FloatField(null=True),
+        ),
+        migrations.RunPython(price_to_cents, cents_to_price),
+        migrations.RemoveField(
+            model_name="product",
+            name="price",
+        ),
+        migrations.RenameField(
+            model_name="product",
+            old_name="price_cents",
+            new_name="price",
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="price",
+            field=utils.fields.MoneyField(),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["is_active", "price"], name="product_active_price_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sellerinventory",
+            name="stock_value",
+            field=utils.fields.MoneyField(default=0),
+        ),
+        migrations.RunPython(rebuild_stock_value, migrations.RunPython.noop),
+    ]
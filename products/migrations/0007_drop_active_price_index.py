@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-17 19:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_price_minor_units"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_active_price_idx",
+        ),
+    ]
@@ -1,17 +1,65 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from utils.fields import MoneyField
 import uuid
 
+SEARCH_CONFIG = "simple"
+
 
 class Product(models.Model):
-    
+
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
     description = models.TextField()
-    price = models.FloatField()
+    # centavos inteiros no banco, Decimal no python (ver utils.fields)
+    price = MoneyField()
     quantity = models.PositiveIntegerField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # mantido pelo trigger e indice GIN da migration 0003 (somente postgres)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     seller = models.ForeignKey(
         "accounts.Account",
         on_delete=models.CASCADE,
         related_name="products",
     )
+
+    # estado salvo usado para atualizar SellerInventory de forma incremental
+    _inventory_state = None
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["seller", "is_active"], name="product_seller_active_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._inventory_state = instance.inventory_state()
+        return instance
+
+    def inventory_state(self):
+        # lido do __dict__ para campos deferred nao dispararem query
+        values = self.__dict__
+        if (
+            self._state.adding
+            or not {"seller_id", "quantity", "price"} <= values.keys()
+        ):
+            return None
+        # price atribuido direto (ex: float) ainda nao passou pelo banco
+        price = self._meta.get_field("price").to_python(values["price"])
+        return (values["seller_id"], values["quantity"], price)
+
+
+class SellerInventory(models.Model):
+    seller = models.OneToOneField(
+        "accounts.Account",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="inventory",
+    )
+    sku_count = models.IntegerField(default=0)
+    units_in_stock = models.BigIntegerField(default=0)
+    stock_value = MoneyField(default=0)
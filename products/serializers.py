@@ -1,10 +1,26 @@
-from .models import Product
+from .models import Product, SellerInventory
 from rest_framework import serializers
 from accounts.serializers import AccountSerializer
 from django.core.validators import MinValueValidator
+from utils import ValuesListSerializer
+
+PRICE_MAX_DIGITS = 12
+
+
+def money_field(max_digits=PRICE_MAX_DIGITS, **kwargs) -> serializers.DecimalField:
+    # Decimal exato, mas continua saindo como numero no JSON, como o float antigo
+    # quebra de API: mais de 2 casas agora e 400 (o FloatField antigo aceitava)
+    return serializers.DecimalField(
+        max_digits=max_digits,
+        decimal_places=2,
+        coerce_to_string=False,
+        **kwargs,
+    )
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    price = money_field(min_value=0)
+
     class Meta:
         model = Product
         fields = [
@@ -14,16 +30,18 @@ class ProductSerializer(serializers.ModelSerializer):
             "is_active",
             "seller_id",
         ]
+        # listagens montadas a partir de queryset.values() (ver ProductView)
+        list_serializer_class = ValuesListSerializer
         extra_kwargs = {
             "seller_id": {"read_only": True},
             "quantity": {"validators": [MinValueValidator(0)]},
-            "price": {"validators": [MinValueValidator(0)]},
         }
 
 
 class ProductDetailSerializer(serializers.ModelSerializer):
 
     seller = AccountSerializer(read_only=True)
+    price = money_field(min_value=0)
 
     class Meta:
         model = Product
@@ -34,9 +52,27 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             "price",
             "quantity",
             "is_active",
+            "updated_at",
         ]
         extra_kwargs = {
             "quantity": {"validators": [MinValueValidator(0)]},
-            "price": {"validators": [MinValueValidator(0)]},
         }
 
+
+class SellerInventorySerializer(serializers.ModelSerializer):
+    stock_value = money_field(max_digits=None, read_only=True)
+
+    class Meta:
+        model = SellerInventory
+        fields = [
+            "seller_id",
+            "sku_count",
+            "units_in_stock",
+            "stock_value",
+        ]
+        read_only_fields = fields
+
+
+class ReservationSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Account
+from .cache import invalidate_product_detail
+from .inventory import apply_inventory_deltas, inventory_deltas
+from .models import Product
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance: Product, **kwargs):
+    invalidate_product_detail(instance.pk)
+
+
+@receiver(post_save, sender=Account)
+def invalidate_seller_products(sender, instance: Account, created: bool, **kwargs):
+    # o detalhe do produto carrega o vendedor aninhado
+    if created:
+        return
+    product_ids = instance.products.values_list("id", flat=True)
+    invalidate_product_detail(*product_ids)
+
+
+@receiver(post_save, sender=Product)
+def update_inventory_on_save(sender, instance: Product, **kwargs):
+    after = instance.inventory_state()
+    apply_inventory_deltas(inventory_deltas([(instance._inventory_state, after)]))
+    instance._inventory_state = after
+
+
+@receiver(post_delete, sender=Product)
+def update_inventory_on_delete(sender, instance: Product, **kwargs):
+    # a linha do vendedor pode ja ter sido apagada junto com a conta
+    deltas = inventory_deltas([(instance._inventory_state, None)])
+    apply_inventory_deltas(deltas, create=False)
@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from products.models import Product
+from utils import idempotency
+
+
+class IdempotencyKeyTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.products_url = "/api/products/"
+        cls.accounts_url = "/api/accounts/"
+        cls.seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.seller2 = Account.objects.create_user(
+            username="vendedor2", password="abcd", is_seller=True
+        )
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.token2 = Token.objects.create(user=cls.seller2)
+        cls.product_data = {
+            "description": "Smartband XYZ 3.0",
+            "price": 100.99,
+            "quantity": 12,
+        }
+        cls.account_data = {
+            "username": "comprador",
+            "password": "abcd",
+            "first_name": "compra",
+            "last_name": "dor",
+            "is_seller": False,
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+
+    def create_product(self, key: str, credentials=None, **data):
+        return self.client.post(
+            self.products_url,
+            {**self.product_data, **data},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+            **(credentials or self.credentials),
+        )
+
+    def test_should_replay_the_first_response_on_retry(self):
+        """
+        it should create the product once and replay the stored response
+        """
+        first = self.create_product("pedido-1")
+        self.assertEqual(201, first.status_code)
+
+        with mock.patch("products.views.ProductView.perform_create") as create:
+            retry = self.create_product("pedido-1")
+        create.assert_not_called()
+        self.assertEqual(201, retry.status_code)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Product.objects.count(), 1)
+
+        # outra chave, ou nenhuma, cria de novo
+        self.assertEqual(201, self.create_product("pedido-2").status_code)
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_should_scope_keys_per_user(self):
+        """
+        it should keep the same key from different users apart
+        """
+        self.create_product("pedido-1")
+        response = self.create_product(
+            "pedido-1", {"HTTP_AUTHORIZATION": f"Token {self.token2.key}"}
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Product.objects.filter(seller=self.seller2).count(), 1)
+
+    def test_should_reject_a_reused_key_with_another_body(self):
+        """
+        it should answer 422 when a key is reused with a different request
+        """
+        self.create_product("pedido-1")
+        response = self.create_product("pedido-1", quantity=1)
+        self.assertEqual(422, response.status_code)
+        self.assertEqual(Product.objects.count(), 1)
+
+        response = self.create_product("x" * 256)
+        self.assertEqual(400, response.status_code)
+
+    def test_should_answer_409_while_the_first_request_runs(self):
+        """
+        it should refuse a concurrent duplicate instead of running it twice
+        """
+        request = mock.Mock(
+            method="POST", path=self.products_url, user=self.seller, META={}
+        )
+        request_id = idempotency.idempotency_id(request, "pedido-1", "")
+        self.assertTrue(idempotency.acquire_lock(request_id))
+
+        response = self.create_product("pedido-1")
+        self.assertEqual(409, response.status_code)
+        self.assertEqual(Product.objects.count(), 0)
+
+        idempotency.release_lock(request_id)
+        self.assertEqual(201, self.create_product("pedido-1").status_code)
+
+    def test_should_not_hash_the_password_again_on_signup_retry(self):
+        """
+        it should replay an account signup without creating or hashing again
+        """
+        first = self.client.post(
+            self.accounts_url, self.account_data, HTTP_IDEMPOTENCY_KEY="cadastro"
+        )
+        self.assertEqual(201, first.status_code)
+
+        with mock.patch("accounts.serializers.hash_password") as hash_password:
+            retry = self.client.post(
+                self.accounts_url, self.account_data, HTTP_IDEMPOTENCY_KEY="cadastro"
+            )
+        hash_password.assert_not_called()
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(
+            Account.objects.filter(username=self.account_data["username"]).count(), 1
+        )
+
+    def test_should_not_replay_another_anonymous_signup(self):
+        """
+        it should keep anonymous signups sharing an address and a key apart
+        """
+        first = self.client.post(
+            self.accounts_url, self.account_data, HTTP_IDEMPOTENCY_KEY="cadastro"
+        )
+        self.assertEqual(201, first.status_code)
+
+        other = {**self.account_data, "username": "outro"}
+        response = self.client.post(
+            self.accounts_url, other, HTTP_IDEMPOTENCY_KEY="cadastro"
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(response.data["username"], "outro")
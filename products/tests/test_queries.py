@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from products.models import Product
+from utils import seed_catalog
+
+# insert no outbox de mudancas; o seq vem depois, na leitura do feed
+OUTBOX_QUERIES = 1
+
+
+class ProductQueryCountTest(APITestCase):
+    """
+    Query budgets for the product endpoints. The catalog is seeded with
+    PERF_SEED_ACCOUNTS/PERF_SEED_PRODUCTS rows so the budgets are checked
+    against more than a handful of rows.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.products_url = "/api/products/"
+        sellers = seed_catalog(
+            accounts=int(os.getenv("PERF_SEED_ACCOUNTS", 20)),
+            products=int(os.getenv("PERF_SEED_PRODUCTS", 1000)),
+        )
+        cls.seller = sellers[0]
+        cls.product = cls.seller.products.first()
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.product_data = {
+            "description": "Smartband XYZ 3.0",
+            "price": 100.99,
+            "quantity": 12,
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        self.detail_url = f"{self.products_url}{self.product.id}/"
+
+    def test_list_products_query_budget(self):
+        """
+        it should list products with a count and a page query
+        """
+        with self.assertNumQueries(2):
+            self.client.get(self.products_url)
+        with self.assertNumQueries(1):
+            self.client.get(self.products_url + "?pagination=cursor")
+
+    def test_list_seller_products_query_budget(self):
+        """
+        it should list a seller storefront with a count and a page query
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/accounts/{self.seller.id}/products/")
+        self.assertEqual(response.data["count"], self.seller.products.count())
+
+    def test_retrieve_product_query_budget(self):
+        """
+        it should load the product and its seller in one query, then hit the cache
+        """
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(self.detail_url)
+        # so as colunas que o ProductDetailSerializer usa
+        sql = context.captured_queries[0]["sql"]
+        self.assertNotIn("search_vector", sql)
+        self.assertNotIn("password", sql)
+        self.assertEqual(response.data["seller"]["id"], str(self.seller.id))
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url)
+
+    def test_create_product_query_budget(self):
+        """
+        it should authenticate, insert, bump the seller inventory, record the
+        change in a savepoint and load the seller for the response
+        """
+        with self.assertNumQueries(6 + OUTBOX_QUERIES):
+            self.client.post(
+                self.products_url,
+                self.product_data,
+                format="json",
+                **self.credentials,
+            )
+
+    def test_update_product_query_budget(self):
+        """
+        it should authenticate, load and update the product and seller
+        inventory and record the change, in a savepoint
+        """
+        with self.assertNumQueries(6 + OUTBOX_QUERIES):
+            self.client.patch(
+                self.detail_url, {"quantity": 1}, format="json", **self.credentials
+            )
+
+    def test_bulk_products_query_budget(self):
+        """
+        it should not issue one query per row on the bulk endpoint
+        """
+        payload = [self.product_data] * 50 + [{"id": str(self.product.id)}]
+        # uma insercao no outbox para os criados e outra para os atualizados
+        with self.assertNumQueries(7 + 2 * OUTBOX_QUERIES):
+            self.client.post(
+                self.products_url + "bulk/",
+                payload,
+                format="json",
+                **self.credentials,
+            )
+
+    def test_reserve_products_query_budget(self):
+        """
+        it should authenticate, run one conditional update per product, read
+        the remaining stock and bump the seller inventory once, in a savepoint,
+        then load the products and record their changes
+        """
+        in_stock = Product.objects.filter(is_active=True, quantity__gt=0)
+        products = in_stock.filter(seller_id=in_stock.first().seller_id)[:3]
+        payload = [{"id": str(product.id), "quantity": 1} for product in products]
+        with self.assertNumQueries(11 + OUTBOX_QUERIES):
+            response = self.client.post(
+                self.products_url + "reserve/",
+                payload,
+                format="json",
+                **self.credentials,
+            )
+        self.assertEqual(200, response.status_code)
+
+    def test_export_products_query_budget(self):
+        """
+        it should export the whole catalog with a single query
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(self.products_url + "export/")
+            rows = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(rows), Product.objects.filter(is_active=True).count())
+
+
+class PerfBaselineCommandTest(APITestCase):
+    def test_should_cover_every_route(self):
+        """
+        it should run perf_baseline end to end, with a case for every route
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "baseline.json")
+            call_command(
+                "perf_baseline",
+                accounts=3,
+                products=10,
+                runs=1,
+                output=output,
+                stdout=io.StringIO(),
+            )
+            with open(output) as baseline:
+                results = json.load(baseline)
+        self.assertIn("accounts/<account_id>/products/", results)
@@ -1,7 +1,27 @@
-from rest_framework.test import APITestCase
-from products.models import Product
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+from django.test import TransactionTestCase
+from django.db import close_old_connections
+from products.models import Product, SEARCH_CONFIG
+from django.contrib.postgres.search import SearchQuery
 from accounts.models import Account
 from django.db.utils import IntegrityError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.utils.http import http_date
+from products.cache import product_cache_stats
+from products.views import ProductDetailView, ProductExportView
+from products.serializers import ProductSerializer
+from rest_framework.renderers import JSONRenderer
+from utils import FastJSONRenderer, ValuesListSerializer
 
 
 class ProductModelTest(APITestCase):
@@ -255,3 +275,866 @@ class ProductViewTest(APITestCase):
             response.data["detail"],
             "You do not have permission to perform this action.",
         )
+
+    def test_should_be_able_to_list_products_with_cursor_pagination(self):
+        """
+        it should be able to walk the products list with keyset pagination
+        """
+        for _ in range(3):
+            self.client.post(
+                self.products_url,
+                self.product1_data,
+                **self.seller_credentials,
+            )
+
+        response = self.client.get(self.products_url + "?pagination=cursor")
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    def test_should_serve_product_detail_from_cache(self):
+        """
+        it should cache the product detail after the first read
+        """
+        cache.clear()
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+        detail_url = self.products_url + product["id"] + "/"
+
+        self.client.get(detail_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(detail_url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.data["id"], product["id"])
+        self.assertEqual(product_cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_should_invalidate_cached_product_detail_on_update(self):
+        """
+        it should not serve a stale product detail after product or seller updates
+        """
+        cache.clear()
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+        detail_url = self.products_url + product["id"] + "/"
+        self.client.get(detail_url)
+
+        patched = {"description": "atualizado com sucesso"}
+        self.client.patch(detail_url, patched, **self.seller_credentials)
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data["description"], patched["description"])
+
+        seller = Account.objects.get(username=self.seller_data["username"])
+        seller.first_name = "alterado"
+        seller.save()
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data["seller"]["first_name"], "alterado")
+
+    def test_should_check_permissions_before_serving_a_cached_detail(self):
+        """
+        it should answer a HEAD the same whether the detail is cached or not
+        """
+        cache.clear()
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+        detail_url = self.products_url + product["id"] + "/"
+
+        cold = [
+            self.client.head(detail_url).status_code,
+            self.client.head(detail_url, **self.seller2_credentials).status_code,
+            self.client.head(detail_url, **self.seller_credentials).status_code,
+        ]
+        etag = self.client.get(detail_url)["ETag"]
+        cached = [
+            self.client.head(detail_url).status_code,
+            self.client.head(detail_url, **self.seller2_credentials).status_code,
+            self.client.head(detail_url, **self.seller_credentials).status_code,
+        ]
+        self.assertEqual([401, 403, 200], cold)
+        self.assertEqual(cold, cached)
+
+        # 304 com o cache frio tambem passa pelas permissions
+        cache.clear()
+        response = self.client.head(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(401, response.status_code)
+
+    def test_should_not_serve_stale_detail_for_a_differently_spelled_id(self):
+        """
+        it should share one cache entry for every spelling of the product id
+        """
+        cache.clear()
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+        spellings = [product["id"].upper(), uuid.UUID(product["id"]).hex]
+        for spelling in spellings:
+            self.client.get(f"{self.products_url}{spelling}/")
+
+        patched = {"description": "atualizado com sucesso"}
+        detail_url = self.products_url + product["id"] + "/"
+        self.client.patch(detail_url, patched, **self.seller_credentials)
+
+        for spelling in spellings:
+            response = self.client.get(f"{self.products_url}{spelling}/")
+            self.assertEqual(patched["description"], response.data["description"])
+
+        response = self.client.get(self.products_url + "abc/")
+        self.assertEqual(404, response.status_code)
+
+    def test_seller_should_be_able_to_create_a_product_with_jwt(self):
+        """
+        it should be able to a seller to create a product using a jwt access token
+        """
+        access = self.client.post("/api/login/jwt/", self.seller_data).data["access"]
+        response = self.client.post(
+            self.products_url,
+            self.product1_data,
+            HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(
+            self.seller_data["username"], response.data["seller"]["username"]
+        )
+
+        access = self.client.post("/api/login/jwt/", self.buyer_data).data["access"]
+        response = self.client.post(
+            self.products_url,
+            self.product1_data,
+            HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+        self.assertEqual(403, response.status_code)
+
+    def test_seller_should_be_able_to_bulk_create_and_update_products(self):
+        """
+        it should create and update products in bulk reporting errors per row
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+        others_product = self.client.post(
+            self.products_url,
+            self.product2_data,
+            **self.seller2_credentials,
+        ).data
+
+        payload = [
+            self.product1_data,
+            self.missing_keys,
+            {"id": product["id"], "quantity": 1},
+            {"id": others_product["id"], "quantity": 1},
+        ]
+        response = self.client.post(
+            self.products_url + "bulk/",
+            payload,
+            format="json",
+            **self.seller_credentials,
+        )
+        self.assertEqual(207, response.status_code)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 3])
+        self.assertEqual(Product.objects.get(pk=product["id"]).quantity, 1)
+        self.assertEqual(Product.objects.get(pk=others_product["id"]).quantity, 90)
+
+    def test_should_report_duplicated_ids_in_bulk_updates(self):
+        """
+        it should apply the first row of a repeated id and report the others
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            **self.seller_credentials,
+        ).data
+
+        payload = [
+            {"id": product["id"], "quantity": 1},
+            {"id": product["id"], "quantity": 2},
+            {"id": product["id"].upper(), "quantity": 3},
+        ]
+        response = self.client.post(
+            self.products_url + "bulk/",
+            payload,
+            format="json",
+            **self.seller_credentials,
+        )
+        self.assertEqual(207, response.status_code)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 2])
+        self.assertEqual(["Duplicated id."], response.data["errors"][0]["errors"]["id"])
+        self.assertEqual(Product.objects.get(pk=product["id"]).quantity, 1)
+
+    def test_seller_should_be_able_to_bulk_create_products_from_ndjson(self):
+        """
+        it should accept a NDJSON body on the bulk endpoint
+        """
+        payload = "\n".join(
+            json.dumps(data) for data in [self.product1_data, self.product2_data]
+        )
+        response = self.client.post(
+            self.products_url + "bulk/",
+            payload,
+            content_type="application/x-ndjson",
+            **self.seller_credentials,
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Product.objects.count(), 2)
+
+        response = self.client.post(
+            self.products_url + "bulk/",
+            payload,
+            content_type="application/x-ndjson",
+            **self.buyer_credentials,
+        )
+        self.assertEqual(403, response.status_code)
+
+    def test_should_be_able_to_export_active_products(self):
+        """
+        it should stream the active products as NDJSON or CSV
+        """
+        self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        )
+        self.client.post(
+            self.products_url,
+            {**self.product2_data, "is_active": False},
+            format="json",
+            **self.seller2_credentials,
+        )
+
+        response = self.client.get(self.products_url + "export/")
+        self.assertEqual(200, response.status_code)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["description"], self.product1_data["description"])
+
+        response = self.client.get(
+            self.products_url + "export/?output=csv&is_active=false"
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(","), ProductExportView.fields)
+        self.assertEqual(len(lines), 2)
+
+    def test_should_filter_export_by_seller(self):
+        """
+        it should only export the products of the given seller
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        self.client.post(
+            self.products_url,
+            self.product2_data,
+            format="json",
+            **self.seller2_credentials,
+        )
+
+        seller_id = product["seller"]["id"]
+        response = self.client.get(self.products_url + f"export/?seller_id={seller_id}")
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(json.loads(rows[0])["seller_id"], seller_id)
+
+        response = self.client.get(self.products_url + "export/?seller_id=abc")
+        self.assertEqual(400, response.status_code)
+
+    def test_should_be_able_to_search_products(self):
+        """
+        it should search products by description combined with filters
+        """
+        self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        )
+        self.client.post(
+            self.products_url,
+            self.product2_data,
+            format="json",
+            **self.seller_credentials,
+        )
+
+        response = self.client.get(self.products_url + "?search=geladeira")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.data["count"])
+        self.assertEqual(
+            self.product2_data["description"],
+            response.data["results"][0]["description"],
+        )
+
+        response = self.client.get(
+            self.products_url + "?search=geladeira&max_price=1000"
+        )
+        self.assertEqual(0, response.data["count"])
+
+        response = self.client.get(self.products_url + "?min_price=abc")
+        self.assertEqual(400, response.status_code)
+        response = self.client.get(self.products_url + "?max_price=100.985")
+        self.assertEqual(400, response.status_code)
+        response = self.client.get(self.products_url + "?max_price=100.990")
+        self.assertEqual(1, response.data["count"])
+
+    def test_should_count_search_facets(self):
+        """
+        it should count the filtered products by seller and price range, and
+        refuse cursor pagination with search
+        """
+        for data in (self.product1_data, self.product2_data, self.product1_data):
+            product = self.client.post(
+                self.products_url, data, format="json", **self.seller_credentials
+            ).data
+
+        response = self.client.get(self.products_url + "?facets=true")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response.data["results"]))
+        facets = response.json()["facets"]
+        self.assertEqual([3], [seller["count"] for seller in facets["seller"]])
+        self.assertEqual(
+            [[0, 50, 0], [50, 100, 0], [100, 500, 2], [500, 1000, 0], [1000, None, 1]],
+            [[row["min"], row["max"], row["count"]] for row in facets["price"]],
+        )
+        etag = response["ETag"]
+
+        response = self.client.get(self.products_url + "?search=geladeira&facets=true")
+        self.assertEqual(1, response.json()["facets"]["price"][-1]["count"])
+
+        self.client.patch(
+            self.products_url + product["id"] + "/",
+            {"price": 10},
+            format="json",
+            **self.seller_credentials,
+        )
+        response = self.client.get(
+            self.products_url + "?facets=true", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.json()["facets"]["price"][0]["count"])
+
+        self.assertNotIn("facets", self.client.get(self.products_url).data)
+        response = self.client.get(self.products_url + "?facets=abc")
+        self.assertEqual(400, response.status_code)
+        response = self.client.get(self.products_url + "?search=x&pagination=cursor")
+        self.assertEqual(400, response.status_code)
+
+    def test_should_list_a_seller_storefront(self):
+        """
+        it should list only the products of one seller, by route or ?seller=
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        self.client.post(
+            self.products_url,
+            {**self.product2_data, "is_active": False},
+            format="json",
+            **self.seller_credentials,
+        )
+        self.client.post(
+            self.products_url,
+            self.product2_data,
+            format="json",
+            **self.seller2_credentials,
+        )
+        seller_id = product["seller"]["id"]
+        storefront_url = f"/api/accounts/{seller_id}/products/"
+
+        response = self.client.get(storefront_url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.data["count"])
+        self.assertEqual(
+            {seller_id}, {item["seller_id"] for item in response.json()["results"]}
+        )
+
+        response = self.client.get(storefront_url + "?is_active=true")
+        self.assertEqual(1, response.data["count"])
+        self.assertEqual(
+            response.data["results"][0]["description"],
+            self.product1_data["description"],
+        )
+
+        response = self.client.get(self.products_url + f"?seller={seller_id}")
+        self.assertEqual(2, response.data["count"])
+        response = self.client.get(self.products_url + "?seller=abc")
+        self.assertEqual(400, response.status_code)
+
+        response = self.client.get("/api/accounts/abc/products/")
+        self.assertEqual(404, response.status_code)
+        response = self.client.post(
+            storefront_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        )
+        self.assertEqual(405, response.status_code)
+
+    def test_should_store_prices_exactly(self):
+        """
+        it should keep prices, price filters and stock value exact to the cent
+        """
+        for price in [0.1, 0.2, "0.30"]:
+            response = self.client.post(
+                self.products_url,
+                {**self.product1_data, "price": price, "quantity": 1},
+                format="json",
+                **self.seller_credentials,
+            )
+            self.assertEqual(201, response.status_code)
+        self.assertEqual(response.json()["price"], 0.3)
+
+        response = self.client.post(
+            self.products_url,
+            {**self.product1_data, "price": 0.125},
+            format="json",
+            **self.seller_credentials,
+        )
+        self.assertEqual(400, response.status_code)
+
+        response = self.client.get(self.products_url + "?min_price=0.2&max_price=0.3")
+        self.assertEqual(2, response.data["count"])
+        response = self.client.get(self.products_url + "?min_price=0.21")
+        self.assertEqual(1, response.data["count"])
+        response = self.client.get(self.products_url + "?max_price=nan")
+        self.assertEqual(400, response.status_code)
+
+        self.assertEqual(
+            list(Product.objects.values_list("price", flat=True).order_by("price")),
+            [Decimal("0.10"), Decimal("0.20"), Decimal("0.30")],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT SUM(price) FROM products_product")
+            self.assertEqual(cursor.fetchone()[0], 60)
+
+        seller_id = Product.objects.first().seller_id
+        response = self.client.get(
+            f"/api/accounts/{seller_id}/inventory/", **self.seller_credentials
+        )
+        self.assertEqual(response.data["stock_value"], Decimal("0.60"))
+        self.assertEqual(response.json()["stock_value"], 0.6)
+
+    def test_should_keep_seller_inventory_up_to_date(self):
+        """
+        it should update the seller inventory on product create, update and delete
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        self.client.post(
+            self.products_url + "bulk/",
+            [self.product2_data, {"id": product["id"], "quantity": 2}],
+            format="json",
+            **self.seller_credentials,
+        )
+        seller_id = product["seller"]["id"]
+        inventory_url = f"/api/accounts/{seller_id}/inventory/"
+
+        response = self.client.get(inventory_url, **self.seller_credentials)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.data["sku_count"], 2)
+        self.assertEqual(response.data["units_in_stock"], 92)
+        self.assertEqual(response.data["stock_value"], Decimal("180273.98"))
+
+        Product.objects.get(pk=product["id"]).delete()
+        response = self.client.get(inventory_url, **self.seller_credentials)
+        self.assertEqual(response.data["sku_count"], 1)
+        self.assertEqual(response.data["units_in_stock"], 90)
+
+        response = self.client.get(inventory_url, **self.seller2_credentials)
+        self.assertEqual(403, response.status_code)
+
+    def test_should_answer_conditional_product_requests(self):
+        """
+        it should answer 304 for unchanged products and 412 for stale updates
+        """
+        product = self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        detail_url = self.products_url + product["id"] + "/"
+
+        response = self.client.get(detail_url)
+        etag = response["ETag"]
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        response = self.client.get(
+            detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(304, response.status_code)
+
+        response = self.client.get(self.products_url)
+        response = self.client.get(
+            self.products_url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(304, response.status_code)
+
+        response = self.client.patch(
+            detail_url,
+            {"quantity": 1},
+            format="json",
+            HTTP_IF_MATCH=etag,
+            **self.seller_credentials,
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response["ETag"])
+
+        response = self.client.patch(
+            detail_url,
+            {"quantity": 2},
+            format="json",
+            HTTP_IF_MATCH=etag,
+            **self.seller_credentials,
+        )
+        self.assertEqual(412, response.status_code)
+        self.assertEqual(Product.objects.get(pk=product["id"]).quantity, 1)
+
+        response = self.client.get(self.products_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+
+    def test_should_not_answer_304_for_a_list_that_lost_rows(self):
+        """
+        it should only validate lists by ETag, which changes when a row
+        leaves the filtered set
+        """
+        for data in (self.product1_data, self.product2_data):
+            product = self.client.post(
+                self.products_url, data, format="json", **self.seller_credentials
+            ).data
+        active_url = self.products_url + "?is_active=true"
+
+        response = self.client.get(active_url)
+        self.assertEqual(2, response.data["count"])
+        self.assertFalse(response.has_header("Last-Modified"))
+        etag = response["ETag"]
+        since = http_date(time.time() + 60)
+
+        self.client.patch(
+            self.products_url + product["id"] + "/",
+            {"is_active": False},
+            format="json",
+            **self.seller_credentials,
+        )
+        response = self.client.get(active_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.data["count"])
+        response = self.client.get(active_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+
+    def test_should_reserve_stock_atomically(self):
+        """
+        it should decrement stock for single and batch reservations, all or nothing
+        """
+        product1 = self.client.post(
+            self.products_url,
+            self.product1_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        product2 = self.client.post(
+            self.products_url,
+            self.product2_data,
+            format="json",
+            **self.seller_credentials,
+        ).data
+        reserve_url = self.products_url + "reserve/"
+
+        response = self.client.post(
+            self.products_url + product1["id"] + "/reserve/",
+            {"quantity": 2},
+            format="json",
+        )
+        self.assertEqual(401, response.status_code)
+
+        response = self.client.post(
+            self.products_url + product1["id"] + "/reserve/",
+            {"quantity": 2},
+            format="json",
+            **self.buyer_credentials,
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.data["reserved"][0]["quantity"], 10)
+
+        response = self.client.post(
+            reserve_url,
+            [
+                {"id": product1["id"], "quantity": 4},
+                {"id": product2["id"], "quantity": 90},
+                {"id": product1["id"], "quantity": 1},
+            ],
+            format="json",
+            **self.buyer_credentials,
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(Product.objects.get(pk=product1["id"]).quantity, 5)
+        self.assertEqual(Product.objects.get(pk=product2["id"]).quantity, 0)
+
+        response = self.client.post(
+            reserve_url,
+            [
+                {"id": product1["id"], "quantity": 1},
+                {"id": product2["id"], "quantity": 1},
+            ],
+            format="json",
+            **self.buyer_credentials,
+        )
+        self.assertEqual(409, response.status_code)
+        self.assertEqual(response.data["products"], [product2["id"]])
+        self.assertEqual(Product.objects.get(pk=product1["id"]).quantity, 5)
+
+        response = self.client.post(
+            reserve_url,
+            [{"id": product1["id"], "quantity": 0}],
+            format="json",
+            **self.buyer_credentials,
+        )
+        self.assertEqual(400, response.status_code)
+
+        response = self.client.get(self.products_url + product1["id"] + "/")
+        self.assertEqual(response.data["quantity"], 5)
+        inventory = self.client.get(
+            f'/api/accounts/{product1["seller"]["id"]}/inventory/',
+            **self.seller_credentials,
+        ).data
+        self.assertEqual(inventory["units_in_stock"], 5)
+        self.assertEqual(inventory["stock_value"], Decimal("504.95"))
+
+    def test_fast_list_serializer_should_match_product_serializer(self):
+        """
+        it should render values() rows with the same bytes as ProductSerializer
+        """
+        seller = Account.objects.get(username=self.seller_data["username"])
+        for description, price in [
+            ("Geladeira \u2028 xiaomi \u00e9", 2000.80),
+            ("Smartband", 0),
+            ("Tablet", 9999999999.99),
+            ("Fone", 0.01),
+        ]:
+            Product.objects.create(
+                description=description, price=price, quantity=3, seller=seller
+            )
+            products = Product.objects.order_by("description")
+            expected = JSONRenderer().render(
+                {"results": ProductSerializer(products, many=True).data}
+            )
+
+            rows = products.values(*ValuesListSerializer.lookups(ProductSerializer()))
+            data = ProductSerializer(rows, many=True).data
+            self.assertEqual(FastJSONRenderer().render({"results": data}), expected)
+
+        response = self.client.get(self.products_url)
+        self.assertEqual(response.data["count"], 4)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres specific")
+class ProductQueryPlanTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.seller = Account.objects.create_user(
+            username="vendedor",
+            password="abcd",
+            first_name="vende",
+            last_name="dor",
+            is_seller=True,
+        )
+        # volume suficiente para o planner preferir os indices sozinho
+        others = Account.objects.bulk_create(
+            Account(username=f"outro{index}", password="!", is_seller=True)
+            for index in range(50)
+        )
+        Product.objects.bulk_create(
+            Product(
+                description=f"Produto {index}",
+                price=10,
+                quantity=1,
+                seller=others[index % len(others)],
+            )
+            for index in range(5000)
+        )
+        Product.objects.bulk_create(
+            Product(
+                description="Geladeira xiaomi", price=10, quantity=1, seller=cls.seller
+            )
+            for _ in range(20)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def explain_view(self, url: str) -> str:
+        """
+        EXPLAIN of the page query the view ran for url, as the views build it.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        sql = [
+            query["sql"]
+            for query in queries
+            if 'FROM "products_product"' in query["sql"] and "LIMIT" in query["sql"]
+        ][-1]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_seller_filter_should_use_index(self):
+        """
+        it should plan the listing filtered by seller through the composite index
+        """
+        plan = self.explain_view(f"/api/products/?seller_id={self.seller.id}")
+        self.assertIn("product_seller_active_idx", plan)
+
+    def test_storefront_should_use_index(self):
+        """
+        it should plan a seller storefront through the seller composite index
+        """
+        plan = self.explain_view(f"/api/accounts/{self.seller.id}/products/")
+        self.assertIn("product_seller_active_idx", plan)
+
+    def test_search_should_use_gin_index(self):
+        """
+        it should plan full text searches through the GIN index
+        """
+        plan = self.explain_view("/api/products/?search=geladeira")
+        self.assertIn("product_search_vector_idx", plan)
+
+    def test_search_vector_should_follow_description(self):
+        """
+        it should keep the search vector updated when the description changes
+        """
+        product = Product.objects.create(
+            description="Geladeira xiaomi", price=10, quantity=1, seller=self.seller
+        )
+        product.description = "Smartband XYZ"
+        product.save()
+        query = SearchQuery("smartband", config=SEARCH_CONFIG)
+        self.assertTrue(Product.objects.filter(search_vector=query).exists())
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "SQLite serializes writers with table locks"
+)
+class ProductReserveConcurrencyTest(TransactionTestCase):
+    workers = 16
+    requests = 64
+
+    def setUp(self) -> None:
+        seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        self.seller_token = Token.objects.create(user=seller).key
+        self.buyers = [
+            Account.objects.create_user(username=f"comprador{index}", password="abcd")
+            for index in range(self.workers)
+        ]
+        self.tokens = [Token.objects.create(user=buyer).key for buyer in self.buyers]
+        self.product = Product.objects.create(
+            description="Smartband XYZ 3.0", price=100.99, quantity=40, seller=seller
+        )
+
+    def reserve(self, index: int) -> int:
+        client = APIClient()
+        try:
+            response = client.post(
+                f"/api/products/{self.product.id}/reserve/",
+                {"quantity": 1},
+                format="json",
+                HTTP_AUTHORIZATION=f"Token {self.tokens[index % self.workers]}",
+            )
+            return response.status_code
+        finally:
+            close_old_connections()
+
+    def test_parallel_reservations_should_not_oversell(self):
+        """
+        it should never reserve more units than the product has in stock
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            statuses = list(executor.map(self.reserve, range(self.requests)))
+
+        self.assertEqual(statuses.count(200), 40)
+        self.assertEqual(statuses.count(409), self.requests - 40)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 0)
+        self.assertEqual(self.product.seller.inventory.units_in_stock, 0)
+
+    def update_price(self, price: str) -> int:
+        client = APIClient()
+        try:
+            response = client.patch(
+                f"/api/products/{self.product.id}/",
+                {"price": price},
+                format="json",
+                HTTP_AUTHORIZATION=f"Token {self.seller_token}",
+            )
+            return response.status_code
+        finally:
+            close_old_connections()
+
+    def test_should_not_lose_a_reservation_made_during_a_patch(self):
+        """
+        it should make a reservation wait for a PATCH that already read the
+        product, instead of letting the PATCH save over the new quantity
+        """
+        locked, release = threading.Event(), threading.Event()
+        perform_update = ProductDetailView.perform_update
+
+        def paused_update(view, serializer):
+            locked.set()
+            release.wait(5)
+            perform_update(view, serializer)
+
+        with mock.patch.object(ProductDetailView, "perform_update", paused_update):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                update = executor.submit(self.update_price, "50.00")
+                self.assertTrue(locked.wait(5))
+                reservation = executor.submit(self.reserve, 0)
+                time.sleep(0.2)
+                self.assertFalse(reservation.done())
+                release.set()
+                self.assertEqual(200, update.result())
+                self.assertEqual(200, reservation.result())
+
+        self.product.refresh_from_db()
+        self.assertEqual(39, self.product.quantity)
+        self.assertEqual(Decimal("50.00"), self.product.price)
+        inventory = self.product.seller.inventory
+        self.assertEqual(39, inventory.units_in_stock)
+        self.assertEqual(Decimal("1950.00"), inventory.stock_value)
@@ -1,7 +1,27 @@
 from rest_framework.urls import path
-from .views import product_view, product_detail_view
+from .views import (
+    product_view,
+    product_bulk_view,
+    product_export_view,
+    product_reserve_view,
+    product_detail_view,
+    seller_product_view,
+)
 
 urlpatterns = [
-    path("products/", product_view),
-    path("products/<product_id>/", product_detail_view),
+    path("products/", product_view, name="product-list"),
+    path("products/bulk/", product_bulk_view, name="product-bulk"),
+    path("products/export/", product_export_view, name="product-export"),
+    path("products/reserve/", product_reserve_view, name="product-reserve"),
+    path("products/<product_id>/", product_detail_view, name="product-detail"),
+    path(
+        "products/<product_id>/reserve/",
+        product_reserve_view,
+        name="product-detail-reserve",
+    ),
+    path(
+        "accounts/<account_id>/products/",
+        seller_product_view,
+        name="account-products",
+    ),
 ]
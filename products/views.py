@@ -1,33 +1,523 @@
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateAPIView
-from .serializers import ProductSerializer, ProductDetailSerializer
-from .models import Product
+from rest_framework.generics import (
+    GenericAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateAPIView,
+)
+from .serializers import (
+    ProductSerializer,
+    ProductDetailSerializer,
+    ReservationSerializer,
+)
+from .models import Product, SEARCH_CONFIG
+from accounts.models import Account
 from .permissions import ReadOnlyOrAuthenticatedSeller, ReadOnlyOrProductOwner
-from utils import SerializerByMethodMixin
+from .inventory import (
+    InsufficientStock,
+    apply_inventory_deltas,
+    inventory_deltas,
+    reserve_stock,
+)
+from changes.mixins import OutboxMixin
+from changes.models import Change
+from changes.outbox import record_changes
+from .cache import (
+    get_product_detail,
+    invalidate_product_detail,
+    set_product_detail,
+)
+from utils import (
+    SerializerByMethodMixin,
+    ConditionalListMixin,
+    FastJSONRenderer,
+    IdempotentCreateMixin,
+    ReplicaReadMixin,
+    ValuesListSerializer,
+    ConditionalUpdateMixin,
+    only_fields,
+    OptInCursorPagination,
+    NDJSONParser,
+    conditional_response,
+    is_conditional,
+    make_validators,
+    representation,
+    set_validators,
+    reading_from_replica,
+)
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+from rest_framework import status
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Count, F, Q
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+import csv
+import json
+import uuid
 
 
-class ProductView(SerializerByMethodMixin, ListCreateAPIView):
+def parse_bool(value: str) -> bool:
+    if value.lower() not in ("true", "false"):
+        raise ValueError(value)
+    return value.lower() == "true"
+
+
+def parse_amount(value: str) -> Decimal:
+    # Decimal, nao float: o filtro vira uma comparacao exata em centavos
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value)
+    if not amount.is_finite():
+        raise ValueError(value)
+    # centavos exatos: arredondar 10.005 para 10.01 deixaria passar um preco
+    # acima do max_price pedido
+    if amount != amount.quantize(Decimal("0.01"), rounding=ROUND_DOWN):
+        raise ValueError(value)
+    return amount
+
+
+class ProductView(
+    ReplicaReadMixin,
+    SerializerByMethodMixin,
+    IdempotentCreateMixin,
+    ConditionalListMixin,
+    ListCreateAPIView,
+):
     queryset = Product.objects.all()
     permission_classes = [ReadOnlyOrAuthenticatedSeller]
+    pagination_class = OptInCursorPagination
+    renderer_classes = [
+        FastJSONRenderer if renderer is JSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+    cursor_ordering = ("id",)
     serializer_map = {
         "GET": ProductSerializer,
         "POST": ProductDetailSerializer,
     }
+    # faixas de preco de ?facets=true: [0, 50), [50, 100), ..., [1000, ...)
+    price_facet_edges = (0, 50, 100, 500, 1000)
+    seller_facet_limit = 10
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != "GET":
+            return queryset
+
+        params = self.request.query_params
+        filters = {}
+        for param, lookup, parse in [
+            ("min_price", "price__gte", parse_amount),
+            ("max_price", "price__lte", parse_amount),
+            ("seller_id", "seller_id", uuid.UUID),
+            ("seller", "seller_id", uuid.UUID),
+            ("is_active", "is_active", parse_bool),
+        ]:
+            if param in params:
+                try:
+                    filters[lookup] = parse(params[param])
+                except ValueError:
+                    raise ValidationError({param: ["Invalid value."]})
+        queryset = queryset.filter(**filters)
+
+        search = params.get("search", "").strip()
+        if search and self.paginator.use_cursor(self.request):
+            # o cursor so anda por colunas estaveis; o rank nao e uma delas
+            raise ValidationError(
+                {"pagination": ["Cursor pagination is not available with search."]}
+            )
+        if search and connection.vendor != "postgresql":
+            # sem tsvector fora do postgres, cai para busca simples
+            queryset = queryset.filter(description__icontains=search)
+        elif search:
+            query = SearchQuery(search, config=SEARCH_CONFIG, search_type="websearch")
+            queryset = (
+                queryset.filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query))
+                .order_by("-rank", "id")
+            )
+
+        # linhas cruas para o ValuesListSerializer (pk/id/updated_at: ETag e cursor)
+        lookups = ValuesListSerializer.lookups(ProductSerializer())
+        return queryset.values(*lookups, "pk", "id", "updated_at")
+
+    def get_list_extras(self, queryset) -> dict:
+        try:
+            facets = parse_bool(self.request.query_params.get("facets", "false"))
+        except ValueError:
+            raise ValidationError({"facets": ["Expected true or false."]})
+        if not facets:
+            return {}
+
+        # contagens sobre o conjunto filtrado inteiro, nao so a pagina
+        queryset = queryset.order_by()
+        sellers = (
+            queryset.values("seller_id")
+            .annotate(count=Count("pk"))
+            .order_by("-count", "seller_id")[: self.seller_facet_limit]
+        )
+        edges = self.price_facet_edges
+        ranges = list(zip(edges, edges[1:] + (None,)))
+        counts = queryset.aggregate(
+            **{
+                f"price_{index}": Count(
+                    "pk",
+                    filter=Q(price__gte=low)
+                    & (Q(price__lt=high) if high is not None else Q()),
+                )
+                for index, (low, high) in enumerate(ranges)
+            }
+        )
+        return {
+            "facets": {
+                "seller": [
+                    {"seller_id": row["seller_id"], "count": row["count"]}
+                    for row in sellers
+                ],
+                "price": [
+                    {"min": low, "max": high, "count": counts[f"price_{index}"]}
+                    for index, (low, high) in enumerate(ranges)
+                ],
+            }
+        }
 
     def perform_create(self, serializer):
-        return serializer.save(seller=self.request.user)
+        # nao passa pelo OutboxMixin: o save recebe o vendedor
+        with transaction.atomic():
+            product = serializer.save(seller_id=self.request.user.pk)
+            record_changes(Change.Action.CREATED, [product], ProductSerializer)
+        return product
 
 
 product_view = ProductView.as_view()
 
 
-class ProductDetailView(SerializerByMethodMixin, RetrieveUpdateAPIView):
+class SellerProductView(ProductView):
+    """
+    A seller's storefront: ProductView's listing (filters, pagination and
+    ETags) restricted to one seller, which the (seller_id, is_active)
+    index serves as a single range scan.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def get_queryset(self):
+        try:
+            seller_id = uuid.UUID(self.kwargs["account_id"])
+        except ValueError:
+            raise NotFound()
+        return super().get_queryset().filter(seller_id=seller_id)
+
+
+seller_product_view = SellerProductView.as_view()
+
+
+class ProductBulkView(GenericAPIView):
     queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    permission_classes = [ReadOnlyOrAuthenticatedSeller]
+    parser_classes = [JSONParser, NDJSONParser]
+    update_fields = ["description", "price", "quantity", "is_active", "updated_at"]
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError({"detail": "Expected a list of products."})
+
+        to_create, to_update, errors = [], {}, []
+        seen_ids = set()
+
+        for row, item in enumerate(request.data):
+            product_id = item.get("id") if isinstance(item, dict) else None
+            if product_id is not None:
+                try:
+                    product_id = uuid.UUID(str(product_id))
+                except ValueError:
+                    errors.append({"row": row, "errors": {"id": ["Invalid id."]}})
+                    continue
+                # a primeira linha vale; as repetidas nao sobrescrevem em silencio
+                if product_id in seen_ids:
+                    errors.append({"row": row, "errors": {"id": ["Duplicated id."]}})
+                    continue
+                seen_ids.add(product_id)
+
+            serializer = self.get_serializer(data=item, partial=bool(product_id))
+            if not serializer.is_valid():
+                errors.append({"row": row, "errors": serializer.errors})
+            elif product_id:
+                to_update[product_id] = (row, serializer.validated_data)
+            else:
+                to_create.append(
+                    Product(**serializer.validated_data, seller_id=request.user.pk)
+                )
+
+        # so atualiza produtos do proprio vendedor
+        products = Product.objects.filter(
+            seller_id=request.user.pk, id__in=to_update.keys()
+        ).in_bulk()
+        updated, changes = [], []
+        for product_id, (row, validated_data) in to_update.items():
+            product = products.get(product_id)
+            if product is None:
+                errors.append({"row": row, "errors": {"id": ["Not found."]}})
+                continue
+            for field, value in validated_data.items():
+                setattr(product, field, value)
+            # bulk_update ignora auto_now
+            product.updated_at = timezone.now()
+            updated.append(product)
+            changes.append((product._inventory_state, product.inventory_state()))
+
+        chunk_size = settings.PRODUCT_BULK_CHUNK_SIZE
+        with transaction.atomic():
+            Product.objects.bulk_create(to_create, batch_size=chunk_size)
+            Product.objects.bulk_update(
+                updated, self.update_fields, batch_size=chunk_size
+            )
+            # bulk_create/bulk_update nao disparam post_save
+            changes += [(None, product.inventory_state()) for product in to_create]
+            apply_inventory_deltas(inventory_deltas(changes))
+            record_changes(Change.Action.CREATED, to_create, ProductSerializer)
+            record_changes(Change.Action.UPDATED, updated, ProductSerializer)
+        invalidate_product_detail(*(product.pk for product in updated))
+
+        errors.sort(key=lambda error: error["row"])
+        return Response(
+            {"created": len(to_create), "updated": len(updated), "errors": errors},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+        )
+
+
+product_bulk_view = ProductBulkView.as_view()
+
+
+class ProductReserveView(GenericAPIView):
+    """
+    Reserves stock atomically: each product is decremented with a single
+    conditional UPDATE, so concurrent buyers can never oversell. Accepts a
+    list of `{"id", "quantity"}` items, or `{"quantity"}` on a product URL.
+    """
+
+    serializer_class = ReservationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        product_id = kwargs.get("product_id")
+        if product_id is not None:
+            data = request.data if isinstance(request.data, dict) else {}
+            serializer = self.get_serializer(
+                data={"id": product_id, "quantity": data.get("quantity")}
+            )
+        elif isinstance(request.data, list) and request.data:
+            serializer = self.get_serializer(data=request.data, many=True)
+        else:
+            raise ValidationError({"detail": "Expected a list of items."})
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+        items = defaultdict(int)
+        for item in validated if isinstance(validated, list) else [validated]:
+            items[item["id"]] += item["quantity"]
+
+        try:
+            with transaction.atomic():
+                rows = reserve_stock(items)
+                # so as colunas do payload do outbox
+                products = Product.objects.filter(pk__in=items).only(
+                    *only_fields(ProductSerializer())
+                )
+                record_changes(Change.Action.UPDATED, products, ProductSerializer)
+        except InsufficientStock as error:
+            return Response(
+                {
+                    "detail": "Insufficient stock.",
+                    "products": [str(product_id) for product_id in error.product_ids],
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+        invalidate_product_detail(*items)
+
+        return Response(
+            {
+                "reserved": [
+                    {
+                        "id": product_id,
+                        "reserved": items[product_id],
+                        "quantity": quantity,
+                    }
+                    for product_id, _, quantity, _ in rows
+                ]
+            }
+        )
+
+
+product_reserve_view = ProductReserveView.as_view()
+
+
+class EchoBuffer:
+    def write(self, value: str) -> str:
+        return value
+
+
+class ProductExportView(APIView):
+    fields = ["id", "description", "price", "quantity", "is_active", "seller_id"]
+    content_types = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output not in self.content_types:
+            raise ValidationError(
+                {"output": [f"Expected one of {list(self.content_types)}."]}
+            )
+
+        rows = (
+            self.get_queryset()
+            .values_list(*self.fields)
+            .iterator(chunk_size=settings.PRODUCT_EXPORT_CHUNK_SIZE)
+        )
+        stream = self.stream_csv(rows) if output == "csv" else self.stream_ndjson(rows)
+
+        response = StreamingHttpResponse(
+            stream, content_type=self.content_types[output]
+        )
+        response["Content-Disposition"] = f'attachment; filename="products.{output}"'
+        return response
+
+    def get_queryset(self):
+        params = self.request.query_params
+        try:
+            is_active = parse_bool(params.get("is_active", "true"))
+        except ValueError:
+            raise ValidationError({"is_active": ["Expected true or false."]})
+
+        queryset = Product.objects.filter(is_active=is_active)
+        if "seller_id" in params:
+            try:
+                seller_id = uuid.UUID(params["seller_id"])
+            except ValueError:
+                raise ValidationError({"seller_id": ["Invalid id."]})
+            queryset = queryset.filter(seller_id=seller_id)
+        return queryset.order_by()
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(dict(zip(self.fields, row)), cls=JSONEncoder) + "\n"
+
+    def stream_csv(self, rows):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(self.fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+
+product_export_view = ProductExportView.as_view()
+
+
+class ProductDetailView(
+    ReplicaReadMixin,
+    SerializerByMethodMixin,
+    ConditionalUpdateMixin,
+    OutboxMixin,
+    RetrieveUpdateAPIView,
+):
+    queryset = Product.objects.select_related("seller")
     permission_classes = [ReadOnlyOrProductOwner]
     lookup_url_kwarg = "product_id"
+    outbox_serializer_class = ProductSerializer
     serializer_map = {
         "GET": ProductDetailSerializer,
         "PATCH": ProductDetailSerializer,
     }
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in ("GET", "HEAD"):
+            # so as colunas do detalhe: sem search_vector nem senha do vendedor
+            queryset = queryset.only(*only_fields(ProductDetailSerializer()))
+        return queryset
+
+    def get_validator_timestamps(self, product: Product) -> list:
+        # o detalhe inclui o vendedor aninhado
+        return [product.updated_at, product.seller.updated_at]
+
+    def retrieve(self, request, *args, **kwargs):
+        # chave canonica: os signals invalidam pelo pk, nao pela url
+        try:
+            product_id = uuid.UUID(kwargs[self.lookup_url_kwarg])
+        except ValueError:
+            raise NotFound()
+        data = get_product_detail(product_id)
+        if data is not None:
+            # o cache nao dispensa as permissions que o get_object checaria
+            seller_id = uuid.UUID(data["seller"]["id"])
+            self.check_object_permissions(
+                request, self.permission_object(product_id, seller_id)
+            )
+
+        if data is None and is_conditional(request):
+            # responde 304 sem serializar quando o cache esta frio
+            not_modified = self.not_modified_from_database(product_id)
+            if not_modified is not None:
+                return not_modified
+
+        if data is None:
+            response = super().retrieve(request, *args, **kwargs)
+            data = response.data
+            # leitura da replica pode estar atrasada: expira junto com o pin
+            timeout = (
+                settings.DATABASE_REPLICA_PIN_SECONDS
+                if reading_from_replica()
+                else settings.PRODUCT_CACHE_TIMEOUT
+            )
+            set_product_detail(product_id, data, timeout)
+        else:
+            response = Response(data)
+
+        timestamps = [data["updated_at"], data["seller"]["updated_at"]]
+        etag, last_modified = make_validators(
+            *representation(request),
+            timestamps=[parse_datetime(timestamp) for timestamp in timestamps],
+        )
+        not_modified = conditional_response(request, etag, last_modified)
+        return set_validators(not_modified or response, etag, last_modified)
+
+    def permission_object(self, product_id: uuid.UUID, seller_id: uuid.UUID):
+        # so o que as permissions leem (pk e vendedor), sem ir ao banco
+        return Product(pk=product_id, seller=Account(pk=seller_id))
+
+    def not_modified_from_database(self, product_id: uuid.UUID):
+        row = (
+            Product.objects.filter(pk=product_id)
+            .values_list("seller_id", "updated_at", "seller__updated_at")
+            .first()
+        )
+        if row is None:
+            return None
+
+        seller_id, *timestamps = row
+        self.check_object_permissions(
+            self.request, self.permission_object(product_id, seller_id)
+        )
+        etag, last_modified = make_validators(
+            *representation(self.request), timestamps=timestamps
+        )
+        not_modified = conditional_response(self.request, etag, last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
 
 product_detail_view = ProductDetailView.as_view()
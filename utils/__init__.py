@@ -1 +1,28 @@
-from .mixins import SerializerByMethodMixin
\ No newline at end of file
+from .mixins import (
+    SerializerByMethodMixin,
+    ConditionalListMixin,
+    ConditionalUpdateMixin,
+    FailedLoginThrottleMixin,
+    IdempotentCreateMixin,
+    PreconditionFailed,
+    ReplicaReadMixin,
+)
+from .pagination import KeysetPagination, OptInCursorPagination, SincePagination
+from .parsers import NDJSONParser
+from .perf import seed_catalog, percentile
+from .conditional import (
+    conditional_response,
+    is_conditional,
+    make_validators,
+    representation,
+    set_validators,
+)
+from .serializers import ValuesListSerializer, only_fields
+from .renderers import FastJSONRenderer, MessagePackRenderer
+from .routers import ReplicaRouter, reading_from_replica
+from .throttling import (
+    AnonReadThrottle,
+    LoginThrottle,
+    SellerWriteThrottle,
+    TokenBucketThrottle,
+)
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    # sem models: registrado para os comandos de benchmark e os testes das
+    # pecas transversais (schema, replicas, conexoes, metricas...)
+    name = "utils"
@@ -0,0 +1,68 @@
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGIHandler that iterates streaming bodies off the event loop. Django
+    4.1 iterates them on the loop, so a generator that reads the database
+    (the product export) raises SynchronousOnlyOperation after the 200 has
+    gone out. Here the parts are pulled in the request's sync thread, the
+    same one that ran the view, a batch at a time.
+    """
+
+    # bytes puxados por ida a thread: evita um salto por linha exportada
+    stream_batch_size = 64 * 1024
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": self.response_headers(response),
+            }
+        )
+        parts = iter(response)
+        take_parts = sync_to_async(self.take_parts, thread_sensitive=True)
+        while batch := await take_parts(parts):
+            for part in batch:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def take_parts(self, parts) -> list:
+        batch, size = [], 0
+        for part in parts:
+            batch.append(part)
+            size += len(part)
+            if size >= self.stream_batch_size:
+                break
+        return batch
+
+    def response_headers(self, response) -> list:
+        # mesmos cabecalhos que o ASGIHandler do Django monta
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append(
+                (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            )
+        return headers
+
+
+def get_asgi_application() -> StreamingASGIHandler:
+    # como o django.core.asgi.get_asgi_application, com o handler acima
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,46 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_validators(*parts, timestamps: list) -> tuple:
+    """
+    Builds the (ETag, Last-Modified) pair for a representation from the
+    modification timestamps it depends on plus any extra `parts`.
+    """
+    stamps = [round(timestamp.timestamp() * 1_000_000) for timestamp in timestamps]
+    digest = hashlib.blake2b(repr((parts, stamps)).encode(), digest_size=16)
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    return f'"{digest.hexdigest()}"', last_modified
+
+
+def representation(request) -> tuple:
+    # partes extras do ETag por formato; JSON (o padrao) fica sem, como antes
+    renderer = getattr(request, "accepted_renderer", None)
+    format = getattr(renderer, "format", "json")
+    return () if format == "json" else (format,)
+
+
+def conditional_response(request, etag: str, last_modified: int):
+    # 304 para GET/HEAD, 412 para escrita com If-Match divergente, ou None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag: str, last_modified: int):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def is_conditional(request) -> bool:
+    return any(
+        header in request.META
+        for header in (
+            "HTTP_IF_MATCH",
+            "HTTP_IF_NONE_MATCH",
+            "HTTP_IF_MODIFIED_SINCE",
+            "HTTP_IF_UNMODIFIED_SINCE",
+        )
+    )
@@ -0,0 +1,78 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+from django.db.models import lookups
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Decimal amount stored as an integer number of minor units (cents by
+    default). Python code, values() rows and serializers see Decimal
+    values; the database only sees integers, so SUM, comparisons and the
+    indexes on the column are exact on every backend. Expressions that mix
+    the column with literals need `Value(amount, output_field=MoneyField())`
+    to be converted to minor units too.
+    """
+
+    description = "Decimal amount stored as integer minor units"
+
+    def __init__(self, *args, decimal_places: int = 2, **kwargs):
+        self.decimal_places = decimal_places
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.decimal_places != 2:
+            kwargs["decimal_places"] = self.decimal_places
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        # SUM no postgres devolve numeric, o resto vem como int
+        return Decimal(value).scaleb(-self.decimal_places)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            if isinstance(value, float):
+                # repr do float: 100.99 vira Decimal("100.99"), nao o binario
+                return Decimal(repr(value))
+            return Decimal(value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages["invalid"],
+                code="invalid",
+                params={"value": value},
+            )
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        try:
+            units = self.to_python(value).scaleb(self.decimal_places)
+            return int(units.to_integral_value(rounding=ROUND_HALF_UP))
+        except (exceptions.ValidationError, InvalidOperation) as e:
+            raise ValueError(
+                f"Field '{self.name}' expected a decimal amount but got {value!r}."
+            ) from e
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(
+            self,
+            **{
+                "form_class": forms.DecimalField,
+                "decimal_places": self.decimal_places,
+                **kwargs,
+            },
+        )
+
+
+# IntegerField arredonda floats nos lookups < e >= antes da conversao, o que
+# aqui cortaria os centavos
+MoneyField.register_lookup(lookups.GreaterThanOrEqual)
+MoneyField.register_lookup(lookups.LessThan)
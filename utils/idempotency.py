@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+RESPONSE_KEY = "idempotency:{}"
+LOCK_KEY = "idempotency-lock:{}"
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still being processed."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was used with a different request."
+    default_code = "idempotency_key_reused"
+
+
+def _cache():
+    return caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+
+
+def idempotency_id(request, key: str, fingerprint: str) -> str:
+    # chave por usuario. Anonimos atras do proxy dividem o IP, entao o corpo
+    # entra na chave: so o mesmo cadastro repetido ve a resposta guardada,
+    # nunca o de outro cliente que escolheu a mesma chave
+    user = request.user
+    if user.is_authenticated:
+        scope = user.pk
+    else:
+        scope = f'{request.META.get("REMOTE_ADDR")}:{fingerprint}'
+    raw = f"{request.method}:{request.path}:{scope}:{key}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def request_fingerprint(request) -> str:
+    # sobre o corpo ja parseado: o serializer reaproveita, sem parsear de novo
+    raw = json.dumps(request.data, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def get_stored_response(idempotency_id: str):
+    return _cache().get(RESPONSE_KEY.format(idempotency_id))
+
+
+def store_response(idempotency_id: str, fingerprint: str, response) -> None:
+    _cache().set(
+        RESPONSE_KEY.format(idempotency_id),
+        (fingerprint, response.status_code, response.data),
+        timeout=settings.IDEMPOTENCY_KEY_TIMEOUT,
+    )
+
+
+def acquire_lock(idempotency_id: str) -> bool:
+    # add e atomico no redis e no locmem: so uma requisicao por chave executa
+    return _cache().add(
+        LOCK_KEY.format(idempotency_id),
+        1,
+        timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+    )
+
+
+def release_lock(idempotency_id: str) -> None:
+    _cache().delete(LOCK_KEY.format(idempotency_id))
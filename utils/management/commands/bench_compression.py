@@ -0,0 +1,65 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import compress_string
+
+from products.models import Product
+from products.serializers import ProductSerializer
+from utils import (
+    FastJSONRenderer,
+    MessagePackRenderer,
+    ValuesListSerializer,
+    percentile,
+    seed_catalog,
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures bytes on the wire and encode time of product pages of "
+        "each --sizes, as JSON and MessagePack, raw, gzip and brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+        parser.add_argument("--runs", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes, runs = options["sizes"], options["runs"]
+
+        with transaction.atomic():
+            seed_catalog(accounts=10, products=max(sizes))
+            rows = list(
+                Product.objects.order_by("id").values(
+                    *ValuesListSerializer.lookups(ProductSerializer())
+                )
+            )
+            transaction.set_rollback(True)
+
+        renderers = {"json": FastJSONRenderer(), "msgpack": MessagePackRenderer()}
+        codings = {"identity": lambda content: content, "gzip": compress_string}
+        if brotli is not None:
+            quality = settings.COMPRESSION_BROTLI_QUALITY
+            codings["br"] = lambda content: brotli.compress(content, quality=quality)
+
+        for size in sizes:
+            data = {"results": ProductSerializer(rows[:size], many=True).data}
+            for format, renderer in renderers.items():
+                for coding, compress in codings.items():
+                    samples = []
+                    for _ in range(runs):
+                        start = perf_counter()
+                        content = compress(renderer.render(data))
+                        samples.append((perf_counter() - start) * 1000)
+                    self.stdout.write(
+                        f"{size:>6} rows {format:>7} {coding:>8}: "
+                        f"{len(content):>9} bytes, "
+                        f"p50 {percentile(samples, 0.5):7.3f}ms"
+                    )
@@ -0,0 +1,71 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures a SELECT 1 request on --database with a new connection per "
+        "request, a persistent connection and (Postgres only) the psycopg2 pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--runs", type=int, default=200)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        runs = options["runs"]
+
+        def fresh():
+            connection.close()
+            self.select_one(connection)
+
+        def persistent():
+            self.select_one(connection)
+
+        modes = {"new connection": fresh, "persistent": persistent}
+
+        if connection.vendor == "postgresql":
+            settings_dict = {
+                **connection.settings_dict,
+                "OPTIONS": {
+                    **connection.settings_dict["OPTIONS"],
+                    "pool": {"min_size": 1, "max_size": 1},
+                },
+            }
+            backend = load_backend("utils.pooled_postgresql")
+            pooled_connection = backend.DatabaseWrapper(settings_dict, "bench_pool")
+
+            def pooled():
+                self.select_one(pooled_connection)
+                pooled_connection.close()
+
+            modes["pooled"] = pooled
+
+        results = {}
+        for name, run in modes.items():
+            run()
+            samples = []
+            for _ in range(runs):
+                start = perf_counter()
+                run()
+                samples.append((perf_counter() - start) * 1000)
+            results[name] = percentile(samples, 0.5)
+            self.stdout.write(
+                f"{name:>14}: p50 {results[name]:6.3f}ms, "
+                f"p95 {percentile(samples, 0.95):6.3f}ms"
+            )
+        connection.close()
+
+        overhead = results["new connection"] - results["persistent"]
+        self.stdout.write(f"connection overhead per request: {overhead:6.3f}ms")
+
+    def select_one(self, connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
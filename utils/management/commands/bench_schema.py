@@ -0,0 +1,51 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.test import APIRequestFactory
+
+from utils import percentile
+from utils.schema import CachedSpectacularAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares /schema/ latency when the OpenAPI schema is generated per "
+        "request, generated once per process, or loaded from --file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--file", default="schema.yml")
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+
+        self.report("per request", SpectacularAPIView.as_view(), runs)
+
+        CachedSpectacularAPIView.clear()
+        self.report("once per process", CachedSpectacularAPIView.as_view(), runs)
+
+        CachedSpectacularAPIView.clear()
+        with override_settings(OPENAPI_SCHEMA_FILE=options["file"]):
+            self.report("from file", CachedSpectacularAPIView.as_view(), runs)
+        CachedSpectacularAPIView.clear()
+
+    def report(self, name: str, view, runs: int) -> None:
+        samples = []
+        for _ in range(runs + 1):
+            request = APIRequestFactory().get("/schema/")
+            start = perf_counter()
+            response = view(request)
+            if hasattr(response, "render"):
+                # Response do DRF so e serializada no render()
+                response.render()
+            samples.append((perf_counter() - start) * 1000)
+
+        # a primeira requisicao e a partida do processo (gera ou le o schema)
+        first, rest = samples[0], samples[1:]
+        self.stdout.write(
+            f"{name:>16}: first request {first:8.2f}ms, "
+            f"p50 {percentile(rest, 0.5):8.2f}ms, p95 {percentile(rest, 0.95):8.2f}ms"
+        )
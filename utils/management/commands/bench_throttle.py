@@ -0,0 +1,74 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from utils import percentile, seed_catalog
+from utils.throttling import take_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures one token bucket check on THROTTLE_CACHE_ALIAS and an "
+        "anonymous product page with throttling on and off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=2000)
+        parser.add_argument("--products", type=int, default=100)
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        self.stdout.write(f"throttle cache: {type(cache).__name__}")
+
+        # balde grande o bastante para nunca negar durante a medicao
+        samples = []
+        for i in range(runs):
+            start = perf_counter()
+            take_token(f"throttle:bench:{i % 100}", runs, 1.0)
+            samples.append((perf_counter() - start) * 1000)
+        check = percentile(samples, 0.5)
+        self.stdout.write(
+            f"   token check: p50 {check:6.3f}ms, "
+            f"p95 {percentile(samples, 0.95):6.3f}ms"
+        )
+
+        rates = {"anon_read": f"{runs * 2}/min"}
+        modes = {
+            "throttled": rates,
+            "unthrottled": {},
+        }
+        results = {}
+        with transaction.atomic():
+            seed_catalog(accounts=10, products=options["products"])
+            client = APIClient(SERVER_NAME="localhost")
+            for name, mode_rates in modes.items():
+                rest_framework = {
+                    **settings.REST_FRAMEWORK,
+                    "DEFAULT_THROTTLE_RATES": mode_rates,
+                }
+                with override_settings(REST_FRAMEWORK=rest_framework):
+                    cache.clear()
+                    client.get("/api/products/")
+                    samples = []
+                    for _ in range(runs // 10):
+                        start = perf_counter()
+                        client.get("/api/products/")
+                        samples.append((perf_counter() - start) * 1000)
+                results[name] = percentile(samples, 0.5)
+                self.stdout.write(
+                    f"{name:>14}: p50 {results[name]:6.3f}ms, "
+                    f"p95 {percentile(samples, 0.95):6.3f}ms"
+                )
+            transaction.set_rollback(True)
+
+        overhead = results["throttled"] - results["unthrottled"]
+        self.stdout.write(
+            f"throttle overhead per request: {overhead:6.3f}ms "
+            f"({check / results['unthrottled']:.2%} of a page in token checks)"
+        )
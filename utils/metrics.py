@@ -0,0 +1,148 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    "request_duration_seconds": ("Wall time per request.", DURATION_BUCKETS),
+    "db_queries": ("SQL queries per request.", QUERY_BUCKETS),
+    "db_duration_seconds": ("Time spent in SQL per request.", DURATION_BUCKETS),
+    "render_duration_seconds": (
+        "Time spent rendering the response body per request.",
+        DURATION_BUCKETS,
+    ),
+    "response_size_bytes": ("Response body size.", SIZE_BUCKETS),
+}
+
+PREFIX = "komercio_"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Per-process histograms labelled by route and method. Each gunicorn
+    worker keeps its own, so scrape every worker or run one per container.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms = {name: {} for name in HISTOGRAMS}
+            self.requests = {}
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        with self.lock:
+            series = self.histograms[name]
+            if labels not in series:
+                series[labels] = Histogram(HISTOGRAMS[name][1])
+            series[labels].observe(value)
+
+    def count_request(self, labels: tuple) -> None:
+        with self.lock:
+            self.requests[labels] = self.requests.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {PREFIX}requests_total Requests by route, method and status.",
+            f"# TYPE {PREFIX}requests_total counter",
+        ]
+        with self.lock:
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'{PREFIX}requests_total{{route="{route}",method="{method}",'
+                    f'status="{status}"}} {count}'
+                )
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines += [
+                    f"# HELP {PREFIX}{name} {help_text}",
+                    f"# TYPE {PREFIX}{name} histogram",
+                ]
+                for (route, method), histogram in sorted(self.histograms[name].items()):
+                    lines += self.render_histogram(name, route, method, histogram)
+        return "\n".join(lines) + "\n"
+
+    def render_histogram(self, name, route, method, histogram) -> list:
+        labels = f'route="{route}",method="{method}"'
+        lines, cumulative = [], 0
+        for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f'{PREFIX}{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines += [
+            f"{PREFIX}{name}_sum{{{labels}}} {histogram.sum}",
+            f"{PREFIX}{name}_count{{{labels}}} {cumulative}",
+        ]
+        return lines
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper: conta e cronometra cada query
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - start
+            self.queries += 1
+
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+def track_queries(execute, sql, params, many, context):
+    # fica em todas as conexoes; so conta quando ha uma requisicao no contexto
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def add_query_tracking(connection, **kwargs) -> None:
+    if track_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_queries)
+
+
+def install_query_tracking() -> None:
+    # conexoes sao por thread: as abertas depois (inclusive nas threads do
+    # sync_to_async, em ASGI) recebem o wrapper pelo sinal
+    connection_created.connect(add_query_tracking, dispatch_uid="track_queries")
+    for connection in connections.all():
+        add_query_tracking(connection)
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
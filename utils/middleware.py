@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import re
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import (
+    RequestStats,
+    current_stats,
+    install_query_tracking,
+    registry,
+)
+from .routers import pin_to_primary
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+slow_request_logger = logging.getLogger("komercio.slow_requests")
+
+
+class AsyncCapableMiddleware:
+    """
+    Middleware that runs natively under WSGI and ASGI. With an async
+    get_response, __call__ returns the acall() coroutine, so Django does not
+    adapt the chain to sync and async views stay off the thread pool.
+    Subclasses implement call() and acall().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # mesma marcacao do MiddlewareMixin do Django 4.1
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.acall(request)
+        return self.call(request)
+
+
+class PerformanceMetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Records wall time, SQL query count and time, time rendering the
+    response body and response size per resolved URL name into
+    utils.metrics.registry, served at /metrics. Requests slower than
+    settings.METRICS_SLOW_REQUEST_MS are logged to the
+    "komercio.slow_requests" logger. Works with DEBUG off.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        install_query_tracking()
+        if self._is_coroutine:
+            # o Django leva para uma thread o hook sincrono em ASGI
+            self.process_template_response = self.aprocess_template_response
+
+    def call(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, start)
+
+    async def acall(self, request):
+        # o ContextVar acompanha o sync_to_async: as queries feitas nas
+        # threads do ORM contam para esta requisicao
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, start)
+
+    def process_template_response(self, request, response):
+        return self.time_rendering(response)
+
+    async def aprocess_template_response(self, request, response):
+        return self.time_rendering(response)
+
+    def time_rendering(self, response):
+        # o Django renderiza a Response do DRF logo depois deste hook; o
+        # callback fecha a medicao quando o corpo fica pronto
+        stats = current_stats.get()
+        if stats is None:
+            return response
+        start = perf_counter()
+
+        def rendered(response):
+            stats.render_seconds += perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, stats, start):
+        route = self.route(request)
+        if response.streaming:
+            # o corpo so e gerado depois que a resposta sai do middleware
+            response.streaming_content = self.measure_stream(
+                response.streaming_content, request, response, route, stats, start
+            )
+        else:
+            self.record(request, response, route, stats, start, len(response.content))
+        return response
+
+    def route(self, request) -> str:
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.url_name or match.route
+
+    def measure_stream(self, content, request, response, route, stats, start):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, route, stats, start, size)
+
+    def record(self, request, response, route, stats, start, size) -> None:
+        duration = perf_counter() - start
+        labels = (route, request.method)
+        registry.count_request((route, request.method, response.status_code))
+        registry.observe("request_duration_seconds", labels, duration)
+        registry.observe("db_queries", labels, stats.queries)
+        registry.observe("db_duration_seconds", labels, stats.db_seconds)
+        registry.observe("render_duration_seconds", labels, stats.render_seconds)
+        registry.observe("response_size_bytes", labels, size)
+
+        if duration * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+            slow_request_logger.warning(
+                "slow request %s %s (%s): %.1fms, %d queries in %.1fms, "
+                "render %.1fms, %d bytes",
+                request.method,
+                request.path,
+                route,
+                duration * 1000,
+                stats.queries,
+                stats.db_seconds * 1000,
+                stats.render_seconds * 1000,
+                size,
+            )
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """
+    Compresses responses with brotli (when installed) or gzip, whichever
+    the client prefers in Accept-Encoding, streamed exports included.
+    Bodies under settings.COMPRESSION_MIN_SIZE go out as they are. The
+    ETag of a compressed response gets the coding as a suffix ("-br",
+    "-gzip"), which is stripped from If-Match/If-None-Match on the way in,
+    so views keep comparing their own strong validators.
+    """
+
+    etag_suffix = re.compile(r'-(?:br|gzip)"')
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.codings = ("br", "gzip") if brotli else ("gzip",)
+
+    def call(self, request):
+        self.strip_etag_suffixes(request)
+        return self.compress_response(request, self.get_response(request))
+
+    async def acall(self, request):
+        self.strip_etag_suffixes(request)
+        response = await self.get_response(request)
+        if response.streaming or len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return self.compress_response(request, response)
+        # compressao de corpo grande e CPU: fora do event loop
+        return await sync_to_async(self.compress_response, thread_sensitive=False)(
+            request, response
+        )
+
+    def strip_etag_suffixes(self, request) -> None:
+        for header in ("HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH"):
+            if header in request.META:
+                request.META[header] = self.etag_suffix.sub('"', request.META[header])
+
+    def compress_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = self.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                coding, response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            content = self.compress(coding, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.endswith('"'):
+            response["ETag"] = f'{etag[:-1]}-{coding}"'
+        response["Content-Encoding"] = coding
+        return response
+
+    def negotiate(self, accept_encoding: str):
+        weights = {}
+        for item in accept_encoding.split(","):
+            coding, _, params = item.partition(";")
+            weight = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[coding.strip().lower()] = weight
+
+        # empate fica com a primeira de self.codings (brotli)
+        coding, weight = None, 0.0
+        for candidate in self.codings:
+            candidate_weight = weights.get(candidate, weights.get("*", 0.0))
+            if candidate_weight > weight:
+                coding, weight = candidate, candidate_weight
+        return coding
+
+    def compress(self, coding: str, content: bytes) -> bytes:
+        if coding == "br":
+            return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compress_string(content)
+
+    def compress_stream(self, coding: str, chunks):
+        if coding == "gzip":
+            yield from compress_sequence(chunks)
+            return
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ReplicaPinningMiddleware(AsyncCapableMiddleware):
+    # depois de uma escrita bem sucedida, o cliente le do primario por um tempo
+    def call(self, request):
+        response = self.get_response(request)
+        if self.should_pin(request, response):
+            pin_to_primary(request, response)
+        return response
+
+    async def acall(self, request):
+        response = await self.get_response(request)
+        if self.should_pin(request, response):
+            # request.user e o cache podem ir ao banco/redis
+            await sync_to_async(pin_to_primary)(request, response)
+        return response
+
+    def should_pin(self, request, response) -> bool:
+        return (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
@@ -1,3 +1,192 @@
+from django.db import transaction
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework import status
+
+from . import idempotency
+from .routers import is_pinned, read_from_replica, reset_reads
+from .throttling import LoginThrottle
+from .conditional import (
+    conditional_response,
+    is_conditional,
+    make_validators,
+    representation,
+    set_validators,
+)
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Precondition failed."
+    default_code = "precondition_failed"
+
+
 class SerializerByMethodMixin:
     def get_serializer_class(self, *args, **kwargs):
-        return self.serializer_map.get(self.request.method, self.serializer_class)
+        # HEAD e um GET sem corpo: mesmo serializer
+        method = "GET" if self.request.method == "HEAD" else self.request.method
+        return self.serializer_map.get(method, self.serializer_class)
+
+
+class ReplicaReadMixin:
+    # leituras vao para uma replica, exceto logo apos uma escrita do mesmo cliente
+    def dispatch(self, request, *args, **kwargs):
+        self.replica_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            reset_reads(self.replica_token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request):
+            self.replica_token = read_from_replica()
+
+
+class ConditionalListMixin:
+    # ETag da pagina sai dos ids e updated_at das linhas, antes de serializar
+    def get_list_extras(self, queryset) -> dict:
+        # chaves extras da resposta paginada (ex. facets), tambem no ETag
+        return {}
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        extras = self.get_list_extras(queryset)
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+
+        page_state = ()
+        if page is not None and hasattr(self.paginator, "get_page_state"):
+            page_state = self.paginator.get_page_state()
+        # linhas de values() (ValuesListSerializer) trazem "pk" e "updated_at"
+        rows = [
+            (obj["pk"], obj["updated_at"])
+            if isinstance(obj, dict)
+            else (obj.pk, obj.updated_at)
+            for obj in objects
+        ]
+        # so ETag: o maior updated_at da pagina nao muda quando uma linha sai
+        # do filtro ou e apagada, entao um Last-Modified daria 304 errado
+        etag, _ = make_validators(
+            *representation(request),
+            page_state,
+            extras,
+            [pk for pk, _ in rows],
+            timestamps=[updated_at for _, updated_at in rows],
+        )
+        not_modified = conditional_response(request, etag, None)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, None)
+
+        serializer = self.get_serializer(objects, many=True)
+        if page is None:
+            response = Response(serializer.data)
+        else:
+            response = self.get_paginated_response(serializer.data)
+            response.data.update(extras)
+        return set_validators(response, etag, None)
+
+
+class ConditionalUpdateMixin:
+    # If-Match/If-Unmodified-Since no PUT/PATCH, com a linha travada ate o save
+    def get_validator_timestamps(self, instance) -> list:
+        return [instance.updated_at]
+
+    def is_write(self) -> bool:
+        return self.request.method in ("PUT", "PATCH")
+
+    def is_conditional_write(self) -> bool:
+        return self.is_write() and is_conditional(self.request)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_write():
+            # toda escrita trava: o save grava a linha inteira e sobrescreveria
+            # um UPDATE concorrente (ex. reserve_stock) feito depois da leitura
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.is_conditional_write():
+            etag, last_modified = make_validators(
+                timestamps=self.get_validator_timestamps(instance)
+            )
+            if conditional_response(self.request, etag, last_modified) is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+        return set_validators(response, *self.updated_validators)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.updated_validators = make_validators(
+            timestamps=self.get_validator_timestamps(serializer.instance)
+        )
+
+
+class IdempotentCreateMixin:
+    """
+    Honors an Idempotency-Key header on create. The first response per key
+    and user is kept for settings.IDEMPOTENCY_KEY_TIMEOUT and replayed on
+    retries without validating, hashing or inserting again. A retry that
+    arrives while the first request still runs gets 409; the same key with
+    a different body gets 422. Anonymous keys are scoped by the body too,
+    so a different body there is simply a different request.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(idempotency.HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            raise ValidationError(
+                {
+                    idempotency.HEADER: [
+                        f"Expected 1 to {idempotency.MAX_KEY_LENGTH} characters."
+                    ]
+                }
+            )
+
+        fingerprint = idempotency.request_fingerprint(request)
+        request_id = idempotency.idempotency_id(request, key, fingerprint)
+        stored = idempotency.get_stored_response(request_id)
+        if stored is None:
+            if not idempotency.acquire_lock(request_id):
+                raise idempotency.IdempotencyKeyInUse()
+            try:
+                # a primeira pode ter terminado entre o get e o lock
+                stored = idempotency.get_stored_response(request_id)
+                if stored is None:
+                    response = super().create(request, *args, **kwargs)
+                    if response.status_code < 500:
+                        idempotency.store_response(request_id, fingerprint, response)
+                    return response
+            finally:
+                idempotency.release_lock(request_id)
+
+        stored_fingerprint, status_code, data = stored
+        if stored_fingerprint != fingerprint:
+            raise idempotency.IdempotencyKeyReused()
+        return Response(
+            data, status=status_code, headers={"Idempotent-Replayed": "true"}
+        )
+
+
+class FailedLoginThrottleMixin:
+    # LoginThrottle so consulta o balde; aqui o token e gasto se o login falhar
+    throttle_classes = [LoginThrottle]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if response.status_code in (
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_401_UNAUTHORIZED,
+        ):
+            for throttle in self.get_throttles():
+                if isinstance(throttle, LoginThrottle):
+                    throttle.record_failure(request, self)
+        return super().finalize_response(request, response, *args, **kwargs)
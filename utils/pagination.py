@@ -0,0 +1,171 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+
+    def get_ordering(self, request, queryset, view):
+        # cada view declara sua chave estavel + o uuid como desempate
+        self.ordering = getattr(view, "cursor_ordering", self.ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+class OptInCursorPagination(BasePagination):
+    """
+    Keeps PageNumberPagination as the default and switches to keyset
+    pagination when the client asks for it with `?pagination=cursor`
+    (or follows a `cursor` link).
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    page_number_class = PageNumberPagination
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    def use_cursor(self, request) -> bool:
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_page_state(self) -> tuple:
+        # o que muda a resposta alem das linhas da pagina (usado no ETag)
+        page = getattr(self.paginator, "page", None)
+        count = getattr(getattr(page, "paginator", None), "count", None)
+        return (
+            count,
+            self.paginator.get_next_link(),
+            self.paginator.get_previous_link(),
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, "display_page_controls", False)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to use keyset pagination.",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            }
+        ]
+        parameters += self.page_number_class().get_schema_operation_parameters(view)
+        parameters += self.cursor_class().get_schema_operation_parameters(view)
+        return parameters
+
+
+class SincePagination(BasePagination):
+    """
+    Pages through an append-only queryset by an increasing integer field:
+    `?since=<n>` returns up to `limit` rows after n, oldest first, plus the
+    value to send next. Nothing is skipped or repeated between pages.
+    """
+
+    since_query_param = "since"
+    limit_query_param = "limit"
+    default_limit = 100
+    max_limit = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.since_field = getattr(view, "since_field", "pk")
+        self.since = self.parse(request, self.since_query_param, 0, minimum=0)
+        self.limit = min(
+            self.parse(request, self.limit_query_param, self.default_limit, minimum=1),
+            self.max_limit,
+        )
+
+        rows = list(
+            queryset.filter(**{f"{self.since_field}__gt": self.since}).order_by(
+                self.since_field
+            )[: self.limit]
+        )
+        self.next_since = getattr(rows[-1], self.since_field) if rows else self.since
+        self.has_more = len(rows) == self.limit
+        return rows
+
+    def parse(self, request, param: str, default: int, minimum: int) -> int:
+        try:
+            value = int(request.query_params.get(param, default))
+        except ValueError:
+            value = minimum - 1
+        if value < minimum:
+            raise ValidationError({param: [f"Expected an integer >= {minimum}."]})
+        return value
+
+    def get_next_link(self):
+        # so aponta adiante quando a pagina veio cheia; senao o cliente repete
+        # a consulta com next_since mais tarde
+        if not self.has_more:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.since_query_param, self.next_since)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next_since": self.next_since,
+                "next": self.get_next_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next_since": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.since_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Return rows after this value (next_since of the last page).",
+                "schema": {"type": "integer", "minimum": 0},
+            },
+            {
+                "name": self.limit_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Rows per page, up to {self.max_limit}.",
+                "schema": {"type": "integer", "minimum": 1},
+            },
+        ]
@@ -0,0 +1,48 @@
+from django.contrib.auth.hashers import make_password
+
+
+def seed_catalog(accounts: int, products: int, batch_size: int = 5000) -> list:
+    """
+    Bulk loads `accounts` sellers and spreads `products` across them.
+    Every account shares the same password hash, so seeding stays cheap.
+    """
+    from accounts.models import Account
+    from products.inventory import rebuild_inventory
+    from products.models import Product
+
+    password = make_password("perf-seed")
+    sellers = Account.objects.bulk_create(
+        [
+            Account(
+                username=f"perf-seller-{index}",
+                password=password,
+                first_name="perf",
+                last_name="seller",
+                is_seller=True,
+            )
+            for index in range(accounts)
+        ],
+        batch_size=batch_size,
+    )
+
+    for start in range(0, products, batch_size):
+        Product.objects.bulk_create(
+            [
+                Product(
+                    description=f"Produto {index}",
+                    price=index % 1000 + 0.99,
+                    quantity=index % 50,
+                    is_active=index % 10 != 0,
+                    seller=sellers[index % accounts],
+                )
+                for index in range(start, min(start + batch_size, products))
+            ]
+        )
+    rebuild_inventory([seller.pk for seller in sellers])
+    return sellers
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
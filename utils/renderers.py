@@ -0,0 +1,66 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import ValuesListSerializer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Encodes listings built by ValuesListSerializer with orjson, producing
+    the same bytes as JSONRenderer. Anything else (or a missing orjson,
+    an indented Accept header, non default JSON settings) goes through
+    JSONRenderer unchanged.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not self.can_use_orjson(data, accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            # orjson.JSONEncodeError, ex: inteiros acima de 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # mesmo escape do JSONRenderer para os separadores de linha do javascript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+    def can_use_orjson(self, data, accepted_media_type, renderer_context) -> bool:
+        if orjson is None or not (self.compact and self.strict):
+            return False
+        if self.ensure_ascii or self.encoder_class is not JSONRenderer.encoder_class:
+            return False
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return False
+        results = data.get("results") if isinstance(data, dict) else data
+        serializer = getattr(results, "serializer", None)
+        return isinstance(serializer, ValuesListSerializer) and serializer.orjson_exact
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders the same data as JSONRenderer as MessagePack, for clients that
+    send `Accept: application/msgpack`. Values JSON has no type for
+    (Decimal, UUID, datetimes) are converted the way JSONRenderer does.
+    Needs the msgpack package; settings only enable it when installed.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
@@ -0,0 +1,70 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_KEY = "db-pinned:{}"
+PIN_COOKIE = "db_pinned"
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica picked for the current request by
+    ReplicaReadMixin; every write (and any read outside those views) goes
+    to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # sem isso, um objeto lido da replica seria salvo de volta nela
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def read_from_replica():
+    # devolve o token para reset_reads, ou None sem replicas configuradas
+    if not settings.DATABASE_REPLICAS:
+        return None
+    return _read_alias.set(random.choice(settings.DATABASE_REPLICAS))
+
+
+def reset_reads(token) -> None:
+    if token is not None:
+        _read_alias.reset(token)
+
+
+def reading_from_replica() -> bool:
+    return _read_alias.get() is not None
+
+
+def pin_to_primary(request, response) -> None:
+    """
+    Keeps the client that just wrote on the primary for
+    DATABASE_REPLICA_PIN_SECONDS, longer than the expected replica lag.
+    """
+    timeout = settings.DATABASE_REPLICA_PIN_SECONDS
+    response.set_cookie(PIN_COOKIE, "1", max_age=timeout, httponly=True)
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        # clientes de API costumam ignorar cookies
+        cache.set(PIN_KEY.format(user.pk), True, timeout=timeout)
+
+
+def is_pinned(request) -> bool:
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = request.user
+    return user.is_authenticated and cache.get(PIN_KEY.format(user.pk), False)
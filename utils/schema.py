@@ -0,0 +1,79 @@
+import hashlib
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from drf_spectacular.views import SpectacularAPIView
+
+from .conditional import conditional_response, set_validators
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView that introspects the API once per process instead
+    of on every request. With settings.OPENAPI_SCHEMA_FILE set, the schema
+    is read from that file (written at build time with
+    `python manage.py spectacular --file schema.yml`) and never generated.
+    Rendered bodies are kept in memory and carry an ETag.
+    """
+
+    _schemas = {}
+    _rendered = {}
+
+    @classmethod
+    def load_schema(cls, version=None, request=None, view=None) -> dict:
+        schema_file = settings.OPENAPI_SCHEMA_FILE
+        key = None if schema_file else (version, translation.get_language())
+        if key not in cls._schemas:
+            if schema_file:
+                with open(schema_file) as file:
+                    # o loader em C (libyaml), quando disponivel, e bem mais rapido
+                    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                    cls._schemas[key] = yaml.load(file, Loader=loader)
+            else:
+                view = view or cls()
+                generator = view.generator_class(
+                    urlconf=view.urlconf, api_version=version, patterns=view.patterns
+                )
+                cls._schemas[key] = generator.get_schema(
+                    request=request, public=view.serve_public
+                )
+        return cls._schemas[key]
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._schemas.clear()
+        cls._rendered.clear()
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        renderer = request.accepted_renderer
+        media_type = request.accepted_media_type
+        key = (version, request.GET.get("lang"), type(renderer), media_type)
+
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            schema = self.load_schema(version, request, self)
+            content = renderer.render(schema, media_type, self.get_renderer_context())
+            etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+            rendered = (content, etag)
+            # parametros arbitrarios no Accept nao podem crescer o cache
+            if media_type == renderer.media_type:
+                self._rendered[key] = rendered
+
+        content, etag = rendered
+        not_modified = conditional_response(request, etag, None)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, None)
+
+        content_type = media_type
+        if renderer.charset:
+            content_type = f"{media_type}; charset={renderer.charset}"
+        response = HttpResponse(content, content_type=content_type)
+        response[
+            "Content-Disposition"
+        ] = f'inline; filename="{self._get_filename(request, version)}"'
+        return set_validators(response, etag, None)
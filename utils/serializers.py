@@ -0,0 +1,112 @@
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from rest_framework import serializers
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+    List serializer for read-only listings. Rows coming from
+    `queryset.values(*ValuesListSerializer.lookups(child))` are rendered
+    with one precompiled converter per field instead of going through the
+    child's field objects; model instances still take the regular path, so
+    both produce the same payload.
+    """
+
+    converters = [
+        (serializers.BooleanField, bool),
+        # Decimal sem coerce_to_string: o encoder JSON do DRF escreve float()
+        (serializers.DecimalField, float),
+        (serializers.FloatField, float),
+        (serializers.IntegerField, int),
+        (serializers.UUIDField, str),
+        (serializers.CharField, str),
+        (serializers.ReadOnlyField, None),
+    ]
+    _compiled = {}
+
+    # payload sem floats que o orjson escreveria diferente (ver FastJSONRenderer)
+    orjson_exact = False
+
+    @classmethod
+    def compile(cls, child) -> list:
+        key = type(child)
+        if key not in cls._compiled:
+            fields = []
+            for field in child._readable_fields:
+                converter = next(
+                    (
+                        (convert,)
+                        for field_class, convert in cls.converters
+                        if isinstance(field, field_class)
+                    ),
+                    None,
+                )
+                if isinstance(field, serializers.DecimalField) and (
+                    field.coerce_to_string
+                ):
+                    converter = (field.to_representation,)
+                if converter is None or field.source == "*":
+                    raise ImproperlyConfigured(
+                        f"{key.__name__}.{field.field_name} cannot be read "
+                        "from values() rows."
+                    )
+                lookup = field.source.replace(".", "__")
+                fields.append((field.field_name, lookup, converter[0]))
+            cls._compiled[key] = fields
+        return cls._compiled[key]
+
+    @classmethod
+    def lookups(cls, child) -> list:
+        return [lookup for _, lookup, _ in cls.compile(child)]
+
+    def to_representation(self, data):
+        rows = data.all() if isinstance(data, models.Manager) else data
+        rows = list(rows)
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+
+        fields = self.compile(self.child)
+        names = [name for name, _, _ in fields]
+        lookups = [lookup for _, lookup, _ in fields]
+        getter = itemgetter(*lookups) if len(lookups) > 1 else None
+        if getter is None:
+            items = [{names[0]: row[lookups[0]]} for row in rows]
+        else:
+            items = [dict(zip(names, getter(row))) for row in rows]
+
+        self.orjson_exact = True
+        for name, _, convert in fields:
+            if convert is None:
+                continue
+            for item in items:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            if convert is float:
+                self.orjson_exact = self.orjson_exact and all(
+                    item[name] is None
+                    or item[name] == 0
+                    or 1e-4 <= abs(item[name]) < 1e16
+                    for item in items
+                )
+        return items
+
+
+def only_fields(serializer, prefix: str = "") -> list:
+    """
+    Model fields read by `serializer`, nested serializers included, for
+    `queryset.select_related(...).only(*only_fields(serializer))`.
+    """
+    fields = []
+    for field in serializer._readable_fields:
+        if field.source == "*":
+            continue
+        source = prefix + field.source.replace(".", "__")
+        if isinstance(field, serializers.BaseSerializer):
+            # a propria FK tambem, para o select_related poder segui-la
+            fields += [source, *only_fields(field, f"{source}__")]
+        else:
+            fields.append(source)
+    return fields
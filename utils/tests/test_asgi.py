@@ -0,0 +1,118 @@
+import asyncio
+import re
+
+from django.core.cache import cache
+from django.core.handlers.base import BaseHandler
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from accounts.models import Account
+from products.models import Product
+from utils.asgi import get_asgi_application
+from utils.metrics import registry
+
+
+class AsyncMiddlewareChainTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.product = Product.objects.create(
+            description="Smartband XYZ 3.0", price=100.99, quantity=12, seller=seller
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    @override_settings(DEBUG=True)
+    def test_should_not_adapt_the_middleware_chain_under_asgi(self):
+        """
+        it should build a fully async chain, without sync adapters
+        """
+        handler = BaseHandler()
+        # o Django registra cada adaptacao em django.request (com DEBUG)
+        with self.assertNoLogs("django.request", "DEBUG"):
+            handler.load_middleware(is_async=True)
+        self.assertTrue(asyncio.iscoroutinefunction(handler._middleware_chain))
+
+    async def test_should_record_async_requests(self):
+        """
+        it should serve the product endpoints under ASGI and count the queries
+        the views run in the handler's threads
+        """
+        response = await self.async_client.get(
+            f"/api/products/{self.product.id}/", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(str(self.product.id), response.json()["id"])
+        self.assertIn("ETag", response)
+
+        metrics = registry.render()
+        self.assertIn(
+            'komercio_db_queries_sum{route="product-detail",method="GET"} 1',
+            metrics,
+        )
+
+    async def test_should_time_rendering_without_a_sync_hook(self):
+        """
+        it should time the rendering of DRF responses served under ASGI
+        """
+        response = await self.async_client.get("/api/products/")
+        self.assertEqual(200, response.status_code)
+
+        match = re.search(
+            r'^komercio_render_duration_seconds_sum{route="product-list",'
+            r'method="GET"} (\S+)$',
+            registry.render(),
+            re.M,
+        )
+        self.assertGreater(float(match.group(1)), 0)
+
+
+class AsgiStreamingTest(TransactionTestCase):
+    def setUp(self) -> None:
+        seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        Product.objects.bulk_create(
+            Product(description=f"Produto {i}", price=10, quantity=1, seller=seller)
+            for i in range(5)
+        )
+
+    async def request(self, path: str) -> list:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await get_asgi_application()(scope, receive, send)
+        return messages
+
+    async def test_should_stream_the_export_through_the_asgi_application(self):
+        """
+        it should read the export rows off the event loop and send every line
+        """
+        messages = await self.request("/api/products/export/")
+
+        self.assertEqual(200, messages[0]["status"])
+        self.assertEqual({"type": "http.response.body"}, messages[-1])
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        self.assertEqual(5, len(body.splitlines()))
@@ -0,0 +1,132 @@
+import gzip
+
+import brotli
+import msgpack
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from products.models import Product
+
+
+@override_settings(COMPRESSION_MIN_SIZE=0)
+class CompressionTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.products = Product.objects.bulk_create(
+            [
+                Product(
+                    description=f"Produto {index} " * 10,
+                    price=index + 0.99,
+                    quantity=index,
+                    seller=cls.seller,
+                )
+                for index in range(20)
+            ]
+        )
+        cls.product = Product.objects.get(pk=cls.products[0].pk)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        self.export_url = "/api/products/export/"
+        self.detail_url = f"/api/products/{self.product.id}/"
+
+    def test_should_negotiate_the_content_coding(self):
+        """
+        it should compress with the coding the client prefers
+        """
+        plain = self.client.get(self.export_url)
+        content = b"".join(plain.streaming_content)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        for accept_encoding, coding in [
+            ("gzip, deflate, br", "br"),
+            ("gzip;q=1.0, br;q=0.5", "gzip"),
+            ("br;q=0, *", "gzip"),
+            ("deflate", None),
+        ]:
+            response = self.client.get(
+                self.export_url, HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            self.assertEqual(response.get("Content-Encoding"), coding)
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+            body = b"".join(response.streaming_content)
+            if coding == "br":
+                body = brotli.decompress(body)
+            elif coding == "gzip":
+                body = gzip.decompress(body)
+            self.assertEqual(body, content)
+
+    def test_should_skip_small_bodies(self):
+        """
+        it should send bodies under COMPRESSION_MIN_SIZE uncompressed
+        """
+        with self.settings(COMPRESSION_MIN_SIZE=1024):
+            response = self.client.get(self.detail_url, HTTP_ACCEPT_ENCODING="br")
+        self.assertLess(len(response.content), 1024)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertNotIn("Accept-Encoding", response.get("Vary", ""))
+
+    def test_should_keep_validators_working_through_compression(self):
+        """
+        it should suffix ETags with the coding and accept them back
+        """
+        plain = self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], plain["ETag"][:-1] + '-gzip"')
+
+        response = self.client.get(
+            self.detail_url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(304, response.status_code)
+
+        response = self.client.patch(
+            self.detail_url,
+            {"quantity": 1},
+            format="json",
+            HTTP_IF_MATCH=response["ETag"],
+            **self.credentials,
+        )
+        self.assertEqual(200, response.status_code)
+
+
+class MessagePackRendererTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.product = Product.objects.create(
+            description="Smartband XYZ 3.0", price=100.99, quantity=12, seller=seller
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_render_messagepack_when_accepted(self):
+        """
+        it should render the JSON payload as MessagePack on request
+        """
+        for url in [
+            "/api/products/",
+            f"/api/products/{self.product.id}/",
+            "/api/accounts/",
+        ]:
+            expected = self.client.get(url)
+            response = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+            self.assertEqual(response["Content-Type"], "application/msgpack")
+            self.assertEqual(msgpack.unpackb(response.content), expected.json())
+            # representacoes diferentes, validadores diferentes
+            self.assertNotEqual(response["ETag"], expected["ETag"])
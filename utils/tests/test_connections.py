@@ -0,0 +1,45 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.utils import load_backend
+from django.test import TransactionTestCase
+
+
+@skipUnless(connection.vendor == "postgresql", "the pool wraps psycopg2")
+class PooledConnectionTest(TransactionTestCase):
+    def setUp(self) -> None:
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                **connection.settings_dict["OPTIONS"],
+                "pool": {"min_size": 1, "max_size": 2},
+            },
+        }
+        backend = load_backend("utils.pooled_postgresql")
+        self.pooled = backend.DatabaseWrapper(settings_dict, "pooled_test")
+        self.addCleanup(self.pooled.close)
+
+    def backend_pid(self) -> int:
+        with self.pooled.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_closing_should_return_the_connection_to_the_pool(self):
+        """
+        it should reuse the same server connection across Django connections
+        """
+        pid = self.backend_pid()
+        self.pooled.close()
+        self.assertEqual(self.backend_pid(), pid)
+
+    def test_should_replace_connections_dropped_by_the_server(self):
+        """
+        it should health check pooled connections before handing them out
+        """
+        pid = self.backend_pid()
+        self.pooled.close()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        self.assertNotEqual(self.backend_pid(), pid)
@@ -0,0 +1,116 @@
+import re
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from products.models import Product
+from utils.metrics import registry
+
+
+class PerformanceMetricsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        Product.objects.create(
+            description="Smartband XYZ 3.0", price=100.99, quantity=12, seller=seller
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def sample(self, metrics: str, name: str, **labels) -> float:
+        selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        match = re.search(
+            rf"^komercio_{name}{{{re.escape(selector)}}} (\S+)$", metrics, re.M
+        )
+        self.assertIsNotNone(match, f"{name}{{{selector}}} not found")
+        return float(match.group(1))
+
+    def test_should_record_metrics_per_url_name(self):
+        """
+        it should expose per route time, queries, render time and size
+        """
+        response = self.client.get("/api/products/")
+        size = len(response.content)
+        self.client.get("/api/products/")
+        self.client.get("/api/nao-existe/")
+
+        metrics = self.client.get("/metrics").content.decode()
+        labels = {"route": "product-list", "method": "GET"}
+
+        self.assertEqual(
+            self.sample(metrics, "requests_total", **labels, status=200), 2
+        )
+        self.assertEqual(
+            self.sample(
+                metrics, "requests_total", route="unmatched", method="GET", status=404
+            ),
+            1,
+        )
+        self.assertEqual(self.sample(metrics, "db_queries_count", **labels), 2)
+        # contagem e pagina, nas duas requisicoes
+        self.assertEqual(self.sample(metrics, "db_queries_sum", **labels), 4)
+        self.assertEqual(self.sample(metrics, "db_queries_bucket", **labels, le="2"), 2)
+        self.assertEqual(
+            self.sample(metrics, "response_size_bytes_sum", **labels), size * 2
+        )
+        self.assertGreater(
+            self.sample(metrics, "render_duration_seconds_sum", **labels), 0
+        )
+        self.assertGreater(
+            self.sample(metrics, "request_duration_seconds_sum", **labels),
+            self.sample(metrics, "db_duration_seconds_sum", **labels),
+        )
+
+    def test_should_not_patch_drf_serializers(self):
+        """
+        it should time the rendering in the middleware, leaving DRF as it is
+        """
+        self.client.get("/api/products/")
+        for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+            data = serializer_class.__dict__["data"]
+            self.assertEqual("rest_framework.serializers", data.fget.__module__)
+
+    def test_should_measure_streaming_responses(self):
+        """
+        it should count the bytes of streamed exports once they are sent
+        """
+        response = self.client.get("/api/products/export/")
+        size = len(b"".join(response.streaming_content))
+
+        metrics = self.client.get("/metrics").content.decode()
+        self.assertEqual(
+            self.sample(
+                metrics, "response_size_bytes_sum", route="product-export", method="GET"
+            ),
+            size,
+        )
+
+    @override_settings(METRICS_TOKEN="segredo")
+    def test_should_require_the_token_when_configured(self):
+        """
+        it should only serve metrics to scrapers with the bearer token
+        """
+        self.assertEqual(401, self.client.get("/metrics").status_code)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer segredo")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    def test_should_log_slow_requests(self):
+        """
+        it should log requests above METRICS_SLOW_REQUEST_MS
+        """
+        with self.assertNoLogs("komercio.slow_requests"):
+            self.client.get("/api/products/")
+
+        with self.settings(METRICS_SLOW_REQUEST_MS=0):
+            with self.assertLogs("komercio.slow_requests", "WARNING") as logs:
+                self.client.get("/api/products/")
+        self.assertIn("GET /api/products/ (product-list)", logs.output[0])
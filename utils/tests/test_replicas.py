@@ -0,0 +1,138 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from products.models import Product
+from utils.routers import PIN_COOKIE, PIN_KEY
+
+REPLICA = "replica_test"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(APITestCase):
+    """
+    Uses a second SQLite database as the replica stand-in. Nothing copies
+    the primary into it, so whatever a request reads tells which database
+    served it.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # alias so desta classe: criado e migrado aqui, removido no
+        # tearDownClass para nao vazar para os outros modulos de teste; fica
+        # fora do databases da classe porque o runner nao o conhece
+        cls.databases = {DEFAULT_DB_ALIAS, REPLICA}
+        connections.settings[REPLICA] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: {"ENGINE": "django.db.backends.sqlite3"}}
+        )[DEFAULT_DB_ALIAS]
+        connections[REPLICA].creation.create_test_db(verbosity=0, serialize=False)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        connections[REPLICA].creation.destroy_test_db(
+            connections[REPLICA].settings_dict["NAME"], verbosity=0
+        )
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        del cls.databases
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.products_url = "/api/products/"
+        cls.seller_data = {
+            "username": "vendedor",
+            "password": "abcd",
+            "first_name": "vende",
+            "last_name": "dor",
+            "is_seller": True,
+        }
+        cls.product_data = {
+            "description": "Smartband XYZ 3.0",
+            "price": 100.99,
+            "quantity": 12,
+        }
+
+        primary_seller = Account.objects.create_user(**cls.seller_data)
+        Product.objects.create(**cls.product_data, seller=primary_seller)
+
+        # a "replica" tem um catalogo diferente do primario
+        replica_seller = Account.objects.using(REPLICA).create(
+            id=primary_seller.id, username="vendedor-replica", is_seller=True
+        )
+        Product.objects.using(REPLICA).bulk_create(
+            [
+                Product(
+                    description="Geladeira replica",
+                    price=2000.80,
+                    quantity=90,
+                    seller=replica_seller,
+                )
+            ]
+        )
+        cls.replica_product = Product.objects.using(REPLICA).get()
+        cls.primary_product = Product.objects.get()
+
+    def setUp(self) -> None:
+        cache.clear()
+        token = self.client.post("/api/login/", self.seller_data).data["token"]
+        self.credentials = {"HTTP_AUTHORIZATION": f"Token {token}"}
+        self.client.cookies.pop(PIN_COOKIE, None)
+        cache.delete(PIN_KEY.format(self.primary_product.seller_id))
+
+    def descriptions(self, **headers) -> list:
+        response = self.client.get(self.products_url, **headers)
+        return [product["description"] for product in response.data["results"]]
+
+    def test_safe_requests_should_read_from_the_replica(self):
+        """
+        it should serve product and account listings and details from the replica
+        """
+        self.assertEqual(self.descriptions(), ["Geladeira replica"])
+
+        response = self.client.get(f"{self.products_url}{self.replica_product.id}/")
+        self.assertEqual(200, response.status_code)
+        response = self.client.get(f"{self.products_url}{self.primary_product.id}/")
+        self.assertEqual(404, response.status_code)
+
+        response = self.client.get("/api/accounts/")
+        usernames = [account["username"] for account in response.data["results"]]
+        self.assertEqual(usernames, ["vendedor-replica"])
+
+    def test_writes_should_go_to_the_primary_and_pin_the_client(self):
+        """
+        it should write to the primary and read the client's own writes back
+        """
+        response = self.client.post(
+            self.products_url,
+            {**self.product_data, "description": "Fone novo"},
+            format="json",
+            **self.credentials,
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertTrue(Product.objects.filter(description="Fone novo").exists())
+        self.assertFalse(
+            Product.objects.using(REPLICA).filter(description="Fone novo").exists()
+        )
+
+        # cookie e chave de cache por usuario mantem o cliente no primario
+        self.assertIn("Fone novo", self.descriptions(**self.credentials))
+        self.client.cookies.pop(PIN_COOKIE)
+        self.assertIn("Fone novo", self.descriptions(**self.credentials))
+
+        # sem pin (ex: outro cliente, ou depois da janela) volta para a replica
+        self.assertEqual(self.descriptions(), ["Geladeira replica"])
+        cache.delete(PIN_KEY.format(self.primary_product.seller_id))
+        self.assertEqual(self.descriptions(**self.credentials), ["Geladeira replica"])
+
+    def test_reads_from_the_replica_should_cache_briefly(self):
+        """
+        it should expire detail cache entries filled from the replica with the pin
+        """
+        with self.settings(DATABASE_REPLICA_PIN_SECONDS=0):
+            self.client.get(f"{self.products_url}{self.replica_product.id}/")
+        with self.assertNumQueries(1, using=REPLICA):
+            self.client.get(f"{self.products_url}{self.replica_product.id}/")
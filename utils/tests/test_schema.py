@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import override_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.test import APIRequestFactory, APITestCase
+from utils.schema import CachedSpectacularAPIView
+
+
+class SchemaViewTest(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        CachedSpectacularAPIView.clear()
+        self.addCleanup(CachedSpectacularAPIView.clear)
+
+    def test_should_serve_the_generated_schema_from_memory(self):
+        """
+        it should generate the schema once and answer If-None-Match with 304
+        """
+        request = APIRequestFactory().get("/schema/")
+        expected = SpectacularAPIView.as_view()(request).render()
+
+        response = self.client.get("/schema/")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/schema/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(304, response.status_code)
+
+        response = self.client.get(
+            "/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+        )
+        self.assertEqual(response.json()["info"]["title"], "Komercio")
+
+    @override_settings(OPENAPI_SCHEMA_FILE="schema.yml")
+    def test_should_serve_the_schema_file_when_configured(self):
+        """
+        it should serve the schema written at build time without generating it
+        """
+        CachedSpectacularAPIView.generator_class, generator_class = (
+            None,
+            CachedSpectacularAPIView.generator_class,
+        )
+        self.addCleanup(
+            setattr, CachedSpectacularAPIView, "generator_class", generator_class
+        )
+        response = self.client.get("/schema/")
+        self.assertEqual(200, response.status_code)
+        with open("schema.yml", "rb") as schema_file:
+            self.assertIn(b"/api/products/reserve/", schema_file.read())
+        self.assertIn(b"/api/products/reserve/", response.content)
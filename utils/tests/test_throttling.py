@@ -0,0 +1,148 @@
+import os
+import threading
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from utils.throttling import take_token
+
+RATES = {"anon_read": "3/min", "seller_write": "2/min", "login": "2/min"}
+THROTTLED = override_settings(
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": RATES}
+)
+
+
+@THROTTLED
+class TokenBucketThrottleTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.products_url = "/api/products/"
+        cls.seller = Account.objects.create_user(
+            username="vendedor", password="abcd", is_seller=True
+        )
+        cls.seller2 = Account.objects.create_user(
+            username="vendedor2", password="abcd", is_seller=True
+        )
+        cls.token = Token.objects.create(user=cls.seller)
+        cls.token2 = Token.objects.create(user=cls.seller2)
+        cls.product_data = {"description": "Smartband", "price": 10, "quantity": 1}
+
+    def setUp(self) -> None:
+        # o locmem faz o papel do redis compartilhado
+        cache.clear()
+        self.now = 1_000_000.0
+        patcher = mock.patch("utils.throttling.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_should_throttle_anonymous_reads_per_ip_and_refill(self):
+        """
+        it should allow a burst of anonymous reads, answer 429 with
+        Retry-After and refill the bucket over time
+        """
+        for _ in range(3):
+            self.assertEqual(200, self.client.get(self.products_url).status_code)
+
+        response = self.client.get(self.products_url)
+        self.assertEqual(429, response.status_code)
+        self.assertEqual("20", response["Retry-After"])
+
+        other_ip = self.client.get(self.products_url, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(200, other_ip.status_code)
+
+        self.now += 20
+        self.assertEqual(200, self.client.get(self.products_url).status_code)
+        self.assertEqual(429, self.client.get(self.products_url).status_code)
+
+    def test_should_not_count_authenticated_reads_as_anonymous(self):
+        """
+        it should leave reads from authenticated users out of the anonymous bucket
+        """
+        credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        for _ in range(5):
+            response = self.client.get(self.products_url, **credentials)
+            self.assertEqual(200, response.status_code)
+
+    def test_should_throttle_writes_per_user(self):
+        """
+        it should throttle each seller's writes in a bucket of their own
+        """
+        credentials = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        for _ in range(2):
+            response = self.client.post(
+                self.products_url, self.product_data, format="json", **credentials
+            )
+            self.assertEqual(201, response.status_code)
+
+        response = self.client.post(
+            self.products_url, self.product_data, format="json", **credentials
+        )
+        self.assertEqual(429, response.status_code)
+
+        response = self.client.post(
+            self.products_url,
+            self.product_data,
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {self.token2.key}",
+        )
+        self.assertEqual(201, response.status_code)
+
+    def test_should_only_count_failed_logins(self):
+        """
+        it should let successful logins through and block an IP after
+        repeated wrong passwords, on both login endpoints
+        """
+        valid = {"username": "vendedor", "password": "abcd"}
+        wrong = {"username": "vendedor", "password": "errada"}
+
+        for _ in range(5):
+            self.assertEqual(200, self.client.post("/api/login/", valid).status_code)
+
+        self.assertEqual(400, self.client.post("/api/login/", wrong).status_code)
+        self.assertEqual(401, self.client.post("/api/login/jwt/", wrong).status_code)
+
+        for url in ("/api/login/", "/api/login/jwt/"):
+            response = self.client.post(url, valid)
+            self.assertEqual(429, response.status_code)
+            self.assertEqual("30", response["Retry-After"])
+
+        response = self.client.post("/api/login/", valid, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(200, response.status_code)
+
+
+class TakeTokenTest(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_not_hand_out_more_tokens_than_capacity_under_contention(self):
+        """
+        it should grant exactly `capacity` requests to concurrent threads
+        """
+        granted = []
+
+        def hammer():
+            for _ in range(50):
+                granted.append(take_token("throttle:test:ip", 100, 1e-6)[0])
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(100, granted.count(True))
+
+    @skipUnless(os.getenv("REDIS_URL"), "needs REDIS_URL")
+    def test_should_take_tokens_atomically_in_redis(self):
+        """
+        it should run the refill and take in the Lua script on redis
+        """
+        caches[settings.THROTTLE_CACHE_ALIAS].delete("throttle:test:redis")
+        results = [take_token("throttle:test:redis", 2, 1e-6) for _ in range(3)]
+        self.assertEqual([True, True, False], [allowed for allowed, _ in results])
+        self.assertGreater(results[-1][1], 0)
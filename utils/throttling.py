@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+BUCKET_KEY = "throttle:{}:{}"
+
+# recarga e retirada num unico round trip; o redis executa o script sem
+# intercalar outros comandos, entao workers concorrentes nao perdem tokens
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    allowed = 1
+    tokens = tokens - cost
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def take_token(key: str, capacity: int, rate: float, cost: int = 1) -> tuple:
+    """
+    Refills the bucket at `key` by `rate` tokens per second up to `capacity`
+    and, if a whole token is left, takes `cost` of them (0 only checks).
+    Returns whether the request may go on and the seconds until it could.
+    """
+    cache = _cache()
+    now = time.time()
+    # um balde cheio de novo e igual a um balde inexistente
+    timeout = math.ceil(capacity / rate) + 1
+
+    if isinstance(cache, RedisCache):
+        key = cache.make_key(key)
+        client = cache._cache.get_client(key, write=True)
+        allowed, tokens = client.register_script(TAKE_SCRIPT)(
+            keys=[key], args=[capacity, rate, repr(now), cost, timeout]
+        )
+        allowed, tokens = bool(allowed), float(tokens)
+    else:
+        # locmem e afins: atomico so dentro do processo
+        with _lock:
+            tokens, updated_at = cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= cost
+            cache.set(key, (tokens, now), timeout=timeout)
+
+    return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client and scope, kept in settings.THROTTLE_CACHE_ALIAS.
+    The rate comes from DEFAULT_THROTTLE_RATES[scope] in DRF's "number/period"
+    format: bursts of up to `number` requests pass and the bucket refills
+    at number/period tokens per second. A missing rate disables the scope.
+    """
+
+    scope = None
+    cost = 1
+
+    def get_rate(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return None
+        num_requests, duration = SimpleRateThrottle.parse_rate(self, rate)
+        return num_requests, num_requests / duration
+
+    def get_cache_key(self, request, view):
+        """Client identifier, or None when the throttle does not apply."""
+        raise NotImplementedError(".get_cache_key() must be overridden")
+
+    def take(self, request, view, cost: int) -> bool:
+        self.wait_seconds = None
+        rate = self.get_rate()
+        ident = self.get_cache_key(request, view) if rate else None
+        if ident is None:
+            return True
+        capacity, refill = rate
+        allowed, self.wait_seconds = take_token(
+            BUCKET_KEY.format(self.scope, ident), capacity, refill, cost
+        )
+        return allowed
+
+    def allow_request(self, request, view):
+        return self.take(request, view, self.cost)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonReadThrottle(TokenBucketThrottle):
+    # leituras anonimas, por IP
+    scope = "anon_read"
+
+    def get_cache_key(self, request, view):
+        if request.method not in SAFE_METHODS or request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class SellerWriteThrottle(TokenBucketThrottle):
+    # escritas autenticadas (catalogo, reservas, conta), por usuario
+    scope = "seller_write"
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS or not request.user.is_authenticated:
+            return None
+        return str(request.user.pk)
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """
+    Failed logins per IP. Checking is free; FailedLoginThrottleMixin spends
+    a token only when the credentials are rejected, so users sharing an IP
+    are not locked out by each other's successful logins.
+    """
+
+    scope = "login"
+    cost = 0
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+    def record_failure(self, request, view) -> None:
+        self.take(request, view, 1)